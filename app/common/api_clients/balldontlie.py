@@ -1,10 +1,22 @@
+import asyncio
+import dataclasses
+import datetime
+import email.utils
+import logging
+import random
 from typing import Any, Generic, TypeVar
 
 import httpx
 from pydantic import BaseModel
 
+from .rate_limiter import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
 T = TypeVar("T")
 
+_RETRIABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
 
 class BaseResponse(BaseModel, Generic[T]):
     data: T
@@ -72,12 +84,138 @@ class MLBGame(BaseModel):
     scoring_summary: list[MLBGameScoringSummary] | None = None
 
 
+@dataclasses.dataclass
+class BalldontlieAPIStats:
+    # Requests sent, including retries.
+    request_cnt: int = 0
+    retry_cnt: int = 0
+    # Requests that had to wait for the rate limiter, and how long they waited in total.
+    throttled_cnt: int = 0
+    throttled_seconds: float = 0.0
+
+
 class BalldontlieAPI:
-    def __init__(self, url: str, api_key: str):
-        self.client = httpx.AsyncClient()
+    """
+    Client of the balldontlie API, shared by every task of the process.
+
+    Requests go through a token bucket of `requests_per_minute`, over a pool of up to `max_connections`
+    kept-alive connections. Timeouts, connection errors, 429s and 5xxs are retried up to `max_retries` times
+    with jittered exponential backoff, or after the delay in Retry-After when the server gives one.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        *,
+        requests_per_minute: float = 60,
+        burst: int = 10,
+        max_connections: int = 10,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(timeout),
+        )
         self.url = url
         self.api_key = api_key
 
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.stats = BalldontlieAPIStats()
+
+        self._rate_limiter = AsyncTokenBucket(requests_per_minute / 60, burst)
+
+    async def _get(
+        self, path: str, params: dict[str, list[str]] | None = None
+    ) -> httpx.Response:
+        attempt = 0
+
+        while True:
+            waited = await self._rate_limiter.acquire()
+            if waited > 0:
+                self.stats.throttled_cnt += 1
+                self.stats.throttled_seconds += waited
+
+            self.stats.request_cnt += 1
+            try:
+                response = await self.client.get(
+                    f"{self.url}{path}",
+                    params=params,
+                    headers={"Authorization": self.api_key},
+                )
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+
+                delay = self._get_backoff(attempt)
+                reason = repr(e)
+            else:
+                if (
+                    response.status_code not in _RETRIABLE_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    response.raise_for_status()
+                    return response
+
+                retry_after = self._get_retry_after(response)
+                if retry_after is None:
+                    delay = self._get_backoff(attempt)
+                elif retry_after > self.backoff_max:
+                    # Not worth holding the task for, the next run will try again.
+                    response.raise_for_status()
+                else:
+                    delay = retry_after
+                    # Holds back the other requests of the process as well.
+                    self._rate_limiter.pause(retry_after)
+
+                reason = f"status {response.status_code}"
+
+            attempt += 1
+            self.stats.retry_cnt += 1
+            logger.warning(
+                "Retrying balldontlie request %s in %.1fs (attempt %d, %s)",
+                path,
+                delay,
+                attempt,
+                reason,
+            )
+            await asyncio.sleep(delay)
+
+    def _get_backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _get_retry_after(self, response: httpx.Response) -> float | None:
+        """Returns the delay in Retry-After, either in seconds or as an HTTP date."""
+
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.UTC)
+
+        return max(
+            0.0, (retry_at - datetime.datetime.now(tz=datetime.UTC)).total_seconds()
+        )
+
     def _prepare_params(self, params: dict[str, Any]) -> dict[str, list[str]]:
         processed = {}
         for key, value in params.items():
@@ -112,20 +250,11 @@ class BalldontlieAPI:
             }
         )
 
-        response = await self.client.get(
-            f"{self.url}/mlb/v1/games",
-            params=params,
-            headers={"Authorization": self.api_key},
-        )
-        response.raise_for_status()
+        response = await self._get("/mlb/v1/games", params)
 
         return PaginatedListResponse[MLBGame].model_validate(response.json())
 
     async def get_mlb_game(self, game_id: int) -> BaseResponse[MLBGame]:
-        response = await self.client.get(
-            f"{self.url}/mlb/v1/games/{game_id}",
-            headers={"Authorization": self.api_key},
-        )
-        response.raise_for_status()
+        response = await self._get(f"/mlb/v1/games/{game_id}")
 
         return BaseResponse[MLBGame].model_validate(response.json())
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket shared by the coroutines of a process. It holds up to `capacity` tokens
+    and gains `rate` tokens per second. Waiters are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError(
+                f"Invalid token bucket (rate = {rate}, capacity = {capacity})"
+            )
+
+        self.rate = rate
+        self.capacity = capacity
+
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """
+        Takes a token, waiting for one if there is none (or for the earlier waiters).
+        Returns the number of seconds waited, 0 when a token was taken right away.
+        """
+
+        if not self._lock.locked():
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+
+        started_at = time.monotonic()
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return time.monotonic() - started_at
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hands out no token for the next `seconds`, e.g. when the server asks to retry later."""
+
+        self._refill()
+        self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
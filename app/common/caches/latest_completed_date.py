@@ -0,0 +1,64 @@
+import asyncio
+import datetime
+
+from sqlalchemy import orm as sa_orm
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.models.app import GameStatusEnum
+
+
+class LatestCompletedDateCache:
+    """
+    Keeps the most recent date with no scheduled or in-progress games in process memory.
+    It is computed on the first read after every invalidation.
+    """
+
+    def __init__(self) -> None:
+        self._value: datetime.date | None = None
+        # Bumped by every invalidation, so that a query that was already running
+        # when the games changed does not store its outdated result.
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._value = None
+        self._generation += 1
+
+    async def get(self) -> datetime.date:
+        if self._value is not None:
+            return self._value
+
+        async with self._lock:
+            if self._value is not None:
+                return self._value
+
+            generation = self._generation
+            value = await self._query()
+            if generation == self._generation:
+                self._value = value
+
+            return value
+
+    async def _query(self) -> datetime.date:
+        pending_game = sa_orm.aliased(m.Game)
+
+        return (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(m.Game.game_date)
+                .where(
+                    ~sa_exp.exists().where(
+                        pending_game.game_date == m.Game.game_date,
+                        pending_game.status.in_(
+                            [
+                                GameStatusEnum.status_scheduled,
+                                GameStatusEnum.status_in_progress,
+                            ]
+                        ),
+                    )
+                )
+                .order_by(m.Game.game_date.desc())
+                .limit(1)
+            )
+        ).scalar_one()
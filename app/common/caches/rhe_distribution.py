@@ -0,0 +1,239 @@
+import array
+import dataclasses
+import datetime
+import itertools
+from collections.abc import Mapping, Sequence
+
+from app.common.caches.rhe_index import RheIndexEntry
+from app.common.models.app import RheDimensionEnum
+from app.common.utils.rhe import unpack_rhe
+
+_DIMENSIONS = tuple(RheDimensionEnum)
+
+# Number of buckets of every dimension. Values past the last bucket are counted in it.
+DIMENSION_SIZES = {
+    RheDimensionEnum.away_r: 31,
+    RheDimensionEnum.away_h: 36,
+    RheDimensionEnum.away_e: 11,
+    RheDimensionEnum.home_r: 31,
+    RheDimensionEnum.home_h: 36,
+    RheDimensionEnum.home_e: 11,
+}
+
+_PAIRS = tuple(itertools.combinations(range(len(_DIMENSIONS)), 2))
+
+_NO_DATE = 0
+
+# Sliced views with fixed dimensions are computed from the combinations on demand.
+# They only change when a game is classified, so the recent ones are kept around.
+_MAX_CACHED_SLICES = 1024
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RheDistributionSlice:
+    x: RheDimensionEnum
+    y: RheDimensionEnum
+    # counts[i][j] is the number of finished games with x == i and y == j.
+    counts: list[list[int]]
+    first_dates: list[list[datetime.date | None]]
+
+
+@dataclasses.dataclass(slots=True)
+class _Plane:
+    counts: array.array
+    # Proleptic ordinals of the first-seen dates, `_NO_DATE` for empty cells.
+    first_dates: array.array
+
+
+class RheDistribution:
+    """
+    Counts and first-seen dates of the RHE scores of finished games, as dense arrays
+    over every pair of RHE components. It is derived from the RHE index, which rebuilds it
+    on load and applies the changed RHEs to it on every refresh.
+    """
+
+    def __init__(self) -> None:
+        # Packed RHE key -> (finished game count, first-seen date ordinal).
+        self._combinations: dict[int, tuple[int, int]] = {}
+        self._planes: dict[tuple[int, int], _Plane] = {}
+        self._slices: dict[tuple, RheDistributionSlice] = {}
+        self._is_loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._is_loaded
+
+    def rebuild(self, entries: Mapping[int, RheIndexEntry]) -> None:
+        self._combinations = {
+            key: (entry.final_count, entry.first_date.toordinal())
+            for key, entry in entries.items()
+            if entry.final_count and entry.first_date is not None
+        }
+        self._rebuild_planes()
+        self._is_loaded = True
+
+    def apply(self, key: int, entry: RheIndexEntry | None) -> None:
+        """Updates the distribution with the current RHE index entry of `key`."""
+
+        if not self._is_loaded:
+            return
+
+        old = self._combinations.pop(key, None)
+        new = None
+        if entry is not None and entry.final_count and entry.first_date is not None:
+            new = self._combinations[key] = (
+                entry.final_count,
+                entry.first_date.toordinal(),
+            )
+
+        if old == new:
+            return
+
+        if old is not None and (new is None or new[0] < old[0] or new[1] > old[1]):
+            # Games were removed or changed their RHE. A first-seen date can not be
+            # moved later within a cell without looking at the other combinations.
+            self._rebuild_planes()
+            return
+
+        assert new is not None
+        self._add(unpack_rhe(key), new[0] - (old[0] if old is not None else 0), new[1])
+        self._slices.clear()
+
+    def get_slice(
+        self,
+        x: RheDimensionEnum,
+        y: RheDimensionEnum,
+        fixed: Mapping[RheDimensionEnum, int],
+    ) -> RheDistributionSlice:
+        """
+        Returns the distribution over `x` and `y` of the games whose other components equal `fixed`.
+        Components that are neither sliced nor fixed are summed over.
+        """
+
+        if x == y or x in fixed or y in fixed:
+            raise ValueError("x, y and the fixed dimensions must all be different")
+
+        cache_key = (x, y, tuple(sorted(fixed.items())))
+        rhe_slice = self._slices.get(cache_key)
+        if rhe_slice is not None:
+            return rhe_slice
+
+        x_index = _DIMENSIONS.index(x)
+        y_index = _DIMENSIONS.index(y)
+
+        if fixed:
+            plane = self._compute_plane(x, y, fixed)
+        elif x_index < y_index:
+            plane = self._planes[(x_index, y_index)]
+        else:
+            plane = _transpose(
+                self._planes[(y_index, x_index)], DIMENSION_SIZES[x], DIMENSION_SIZES[y]
+            )
+
+        rhe_slice = _to_slice(x, y, plane)
+
+        if len(self._slices) >= _MAX_CACHED_SLICES:
+            self._slices.clear()
+        self._slices[cache_key] = rhe_slice
+
+        return rhe_slice
+
+    def _rebuild_planes(self) -> None:
+        self._planes = {
+            (i, j): _new_plane(
+                DIMENSION_SIZES[_DIMENSIONS[i]] * DIMENSION_SIZES[_DIMENSIONS[j]]
+            )
+            for i, j in _PAIRS
+        }
+        for key, (count, first_date) in self._combinations.items():
+            self._add(unpack_rhe(key), count, first_date)
+
+        self._slices.clear()
+
+    def _add(self, rhe: Sequence[int], count: int, first_date: int) -> None:
+        buckets = _to_buckets(rhe)
+
+        for (i, j), plane in self._planes.items():
+            cell = buckets[i] * DIMENSION_SIZES[_DIMENSIONS[j]] + buckets[j]
+            plane.counts[cell] += count
+            if (
+                plane.first_dates[cell] == _NO_DATE
+                or first_date < plane.first_dates[cell]
+            ):
+                plane.first_dates[cell] = first_date
+
+    def _compute_plane(
+        self,
+        x: RheDimensionEnum,
+        y: RheDimensionEnum,
+        fixed: Mapping[RheDimensionEnum, int],
+    ) -> _Plane:
+        x_index = _DIMENSIONS.index(x)
+        y_index = _DIMENSIONS.index(y)
+        y_size = DIMENSION_SIZES[y]
+        conditions = [(_DIMENSIONS.index(dim), value) for dim, value in fixed.items()]
+
+        plane = _new_plane(DIMENSION_SIZES[x] * y_size)
+
+        for key, (count, first_date) in self._combinations.items():
+            rhe = unpack_rhe(key)
+            if any(rhe[index] != value for index, value in conditions):
+                continue
+
+            buckets = _to_buckets(rhe)
+            cell = buckets[x_index] * y_size + buckets[y_index]
+            plane.counts[cell] += count
+            if (
+                plane.first_dates[cell] == _NO_DATE
+                or first_date < plane.first_dates[cell]
+            ):
+                plane.first_dates[cell] = first_date
+
+        return plane
+
+
+def _new_plane(size: int) -> _Plane:
+    return _Plane(
+        counts=array.array("q", [0]) * size,
+        first_dates=array.array("q", [_NO_DATE]) * size,
+    )
+
+
+def _to_buckets(rhe: Sequence[int]) -> list[int]:
+    return [
+        min(value, DIMENSION_SIZES[dim] - 1) for dim, value in zip(_DIMENSIONS, rhe)
+    ]
+
+
+def _transpose(plane: _Plane, x_size: int, y_size: int) -> _Plane:
+    """Transposes a plane stored with `y` as its rows into one with `x` as its rows."""
+
+    transposed = _new_plane(x_size * y_size)
+    for i in range(x_size):
+        for j in range(y_size):
+            transposed.counts[i * y_size + j] = plane.counts[j * x_size + i]
+            transposed.first_dates[i * y_size + j] = plane.first_dates[j * x_size + i]
+
+    return transposed
+
+
+def _to_slice(
+    x: RheDimensionEnum, y: RheDimensionEnum, plane: _Plane
+) -> RheDistributionSlice:
+    y_size = DIMENSION_SIZES[y]
+    rows = range(0, DIMENSION_SIZES[x] * y_size, y_size)
+
+    return RheDistributionSlice(
+        x=x,
+        y=y,
+        counts=[plane.counts[row : row + y_size].tolist() for row in rows],
+        first_dates=[
+            [
+                datetime.date.fromordinal(first_date)
+                if first_date != _NO_DATE
+                else None
+                for first_date in plane.first_dates[row : row + y_size]
+            ]
+            for row in rows
+        ],
+    )
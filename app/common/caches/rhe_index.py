@@ -0,0 +1,323 @@
+import array
+import asyncio
+import dataclasses
+import datetime
+import logging
+import time
+from collections.abc import Collection, Sequence
+
+from sqlalchemy import func as sa_func
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.utils.rhe import iter_keys_above, iter_keys_at_distance, pack_rhe
+
+logger = logging.getLogger(__name__)
+
+# `updated_at` is the start time of the writing transaction, so a row can become
+# visible after the watermark has already moved past it. Every refresh re-reads
+# this much history to pick those rows up; reprocessing a row is harmless.
+_REFRESH_LOOKBACK = datetime.timedelta(minutes=5)
+
+_NO_KEY = -1
+
+
+@dataclasses.dataclass(slots=True)
+class RheIndexEntry:
+    # Number of games with this RHE, including games that are still in progress.
+    count: int
+    # The fields below only consider finished games (is_scorhegami IS NOT NULL).
+    final_count: int
+    first_date: datetime.date | None
+    last_date: datetime.date | None
+    scorhegami_game_id: int | None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RheNeighbor:
+    key: int
+    distance: int
+    # None if no finished game has had the RHE yet.
+    entry: RheIndexEntry | None
+
+
+class RheIndex:
+    """
+    Process-local map from packed RHE keys to occurrence statistics of the `game` table.
+    Whether an RHE has been seen is answered from the seen RHE set shared by the web workers,
+    which one of them writes from its own index, and from this index until that set is available.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, RheIndexEntry] = {}
+        # Packed RHE key of every game, addressed by game id. Needed to find the
+        # previous key of a game whose RHE has changed since the last refresh.
+        self._game_keys = array.array("q")
+        self._watermark = datetime.datetime.min.replace(tzinfo=datetime.UTC)
+        # Deleted games don't show up in the `updated_at` scan of a refresh, so their ids
+        # come from the game_deleted notifications instead.
+        self._deleted_game_ids: set[int] = set()
+        self._is_reload_needed = False
+        self._is_loaded = False
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._is_loaded
+
+    def discard_games(self, game_ids: Collection[int] | None) -> None:
+        """
+        Drops deleted games on the next refresh. None means that deletions may have been missed
+        (e.g. while the notification listener was down), so the next sync reloads the index.
+        """
+
+        if game_ids is None:
+            self._is_reload_needed = True
+        else:
+            self._deleted_game_ids.update(game_ids)
+
+    def get(self, rhe: Sequence[int]) -> RheIndexEntry | None:
+        try:
+            key = pack_rhe(rhe)
+        except ValueError:
+            return None
+
+        return self._entries.get(key)
+
+    def is_seen(self, rhe: Sequence[int]) -> bool:
+        """Whether a finished game has had the RHE. A single hash table lookup."""
+
+        try:
+            key = pack_rhe(rhe)
+        except ValueError:
+            return False
+
+        return self._is_key_seen(key)
+
+    def find_unseen_finals(
+        self, rhe: Sequence[int], *, max_increase: int
+    ) -> list[tuple[int, int]]:
+        """
+        Returns (packed key, increase) of the RHEs no finished game has had yet that the
+        partial RHE of a live game can still end with, adding up to `max_increase` in total.
+        """
+
+        return [
+            (key, increase)
+            for key, increase in iter_keys_above(rhe, max_increase)
+            if not self._is_key_seen(key)
+        ]
+
+    def find_nearest(
+        self, rhe: Sequence[int], *, count: int, max_distance: int
+    ) -> tuple[list[RheNeighbor], list[RheNeighbor]]:
+        """
+        Returns up to `count` of the nearest seen and unseen RHEs (by finished games) around `rhe`,
+        in L1 distance up to `max_distance`, nearest first. `rhe` itself is at distance 0.
+        """
+
+        seen: list[RheNeighbor] = []
+        unseen: list[RheNeighbor] = []
+
+        for distance in range(max_distance + 1):
+            for key in iter_keys_at_distance(rhe, distance):
+                entry = self._entries.get(key)
+
+                if entry is not None and entry.final_count:
+                    if len(seen) < count:
+                        seen.append(RheNeighbor(key, distance, entry))
+                elif len(unseen) < count:
+                    unseen.append(RheNeighbor(key, distance, None))
+
+                if len(seen) == count and len(unseen) == count:
+                    return seen, unseen
+
+        return seen, unseen
+
+    async def sync(self, reload_interval: float) -> None:
+        """Reloads the index if it is older than `reload_interval` seconds, otherwise refreshes it."""
+
+        if (
+            not self._is_loaded
+            or self._is_reload_needed
+            or time.monotonic() - self._loaded_at > reload_interval
+        ):
+            await self.load()
+        else:
+            await self.refresh()
+
+            # Takes over writing the shared seen RHE set if its writer has gone away.
+            seen_rhes = AppCtx.current.seen_rhes
+            if not seen_rhes.is_writer:
+                seen_rhes.rebuild(self._entries)
+
+    async def load(self) -> None:
+        async with self._lock:
+            # Set before reading, so that deletions notified during the load are kept for
+            # the next refresh. Games deleted before the read are just not loaded.
+            self._is_reload_needed = False
+            self._deleted_game_ids.clear()
+
+            watermark = (
+                await AppCtx.current.db.session.execute(
+                    sa_exp.select(sa_func.max(m.Game.updated_at))
+                )
+            ).scalar()
+
+            rows = (
+                await AppCtx.current.db.session.execute(
+                    sa_exp.select(
+                        m.Game.id,
+                        m.Game.rhe_key,
+                        m.Game.game_date,
+                        m.Game.is_scorhegami,
+                    ).where(m.Game.rhe_key.isnot(None))
+                )
+            ).all()
+
+            self._entries = {}
+            self._game_keys = array.array("q")
+
+            for game_id, key, game_date, is_scorhegami in rows:
+                self._set_game_key(game_id, key)
+
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = RheIndexEntry(
+                        count=0,
+                        final_count=0,
+                        first_date=None,
+                        last_date=None,
+                        scorhegami_game_id=None,
+                    )
+
+                entry.count += 1
+
+                if is_scorhegami is None:
+                    continue
+
+                entry.final_count += 1
+                if entry.first_date is None or game_date < entry.first_date:
+                    entry.first_date = game_date
+                if entry.last_date is None or game_date > entry.last_date:
+                    entry.last_date = game_date
+                if is_scorhegami and (
+                    entry.scorhegami_game_id is None
+                    or game_id < entry.scorhegami_game_id
+                ):
+                    entry.scorhegami_game_id = game_id
+
+            AppCtx.current.rhe_distribution.rebuild(self._entries)
+            AppCtx.current.seen_rhes.rebuild(self._entries)
+
+            if watermark is not None:
+                self._watermark = watermark
+            self._is_loaded = True
+            self._loaded_at = time.monotonic()
+
+            logger.info(
+                "Loaded RHE index (%d games, %d distinct RHEs)",
+                len(rows),
+                len(self._entries),
+            )
+
+    async def refresh(self) -> None:
+        """Applies the games updated since the last load or refresh."""
+
+        async with self._lock:
+            changed_games = (
+                await AppCtx.current.db.session.execute(
+                    sa_exp.select(m.Game.id, m.Game.rhe_key, m.Game.updated_at).where(
+                        m.Game.updated_at > self._watermark - _REFRESH_LOOKBACK
+                    )
+                )
+            ).all()
+
+            touched_keys: set[int] = set()
+            watermark = self._watermark
+
+            deleted_game_ids = self._deleted_game_ids
+            self._deleted_game_ids = set()
+
+            for game_id in deleted_game_ids:
+                old_key = self._get_game_key(game_id)
+                if old_key != _NO_KEY:
+                    touched_keys.add(old_key)
+                    self._set_game_key(game_id, _NO_KEY)
+
+            for game_id, rhe_key, updated_at in changed_games:
+                old_key = self._get_game_key(game_id)
+                new_key = rhe_key if rhe_key is not None else _NO_KEY
+
+                touched_keys.update(key for key in (old_key, new_key) if key != _NO_KEY)
+                self._set_game_key(game_id, new_key)
+                watermark = max(watermark, updated_at)
+
+            if touched_keys:
+                try:
+                    await self._reaggregate(touched_keys)
+                except Exception:
+                    # The game keys have already moved on, so the next refresh would not
+                    # touch these keys again.
+                    self._is_reload_needed = True
+                    raise
+
+            self._watermark = watermark
+
+    async def _reaggregate(self, keys: set[int]) -> None:
+        is_final = m.Game.is_scorhegami.isnot(None)
+
+        rows = (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(
+                    m.Game.rhe_key,
+                    sa_func.count(),
+                    sa_func.count().filter(is_final),
+                    sa_func.min(m.Game.game_date).filter(is_final),
+                    sa_func.max(m.Game.game_date).filter(is_final),
+                    sa_func.min(m.Game.id).filter(m.Game.is_scorhegami.is_(True)),
+                )
+                .where(m.Game.rhe_key.in_(keys))
+                .group_by(m.Game.rhe_key)
+            )
+        ).all()
+
+        for key in keys:
+            self._entries.pop(key, None)
+
+        for key, count, final_count, first_date, last_date, scorhegami_id in rows:
+            self._entries[key] = RheIndexEntry(
+                count=count,
+                final_count=final_count,
+                first_date=first_date,
+                last_date=last_date,
+                scorhegami_game_id=scorhegami_id,
+            )
+
+        for key in keys:
+            AppCtx.current.rhe_distribution.apply(key, self._entries.get(key))
+            AppCtx.current.seen_rhes.apply(key, self._entries.get(key))
+
+    def _is_key_seen(self, key: int) -> bool:
+        is_seen = AppCtx.current.seen_rhes.contains(key)
+        if is_seen is not None:
+            return is_seen
+
+        entry = self._entries.get(key)
+        return entry is not None and entry.final_count > 0
+
+    def _get_game_key(self, game_id: int) -> int:
+        if game_id < len(self._game_keys):
+            return self._game_keys[game_id]
+        return _NO_KEY
+
+    def _set_game_key(self, game_id: int, key: int) -> None:
+        if game_id >= len(self._game_keys):
+            if key == _NO_KEY:
+                return
+            self._game_keys.extend(
+                array.array("q", [_NO_KEY]) * (game_id + 1 - len(self._game_keys))
+            )
+        self._game_keys[game_id] = key
@@ -0,0 +1,291 @@
+import fcntl
+import logging
+import mmap
+import os
+import time
+from collections.abc import Mapping
+
+from app.common.caches.rhe_index import RheIndexEntry
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = int.from_bytes(b"SEENRHES", "little")
+
+# The file starts with these header slots, followed by two tables of `capacity` slots.
+_HEADER_MAGIC = 0
+_HEADER_CAPACITY = 1
+_HEADER_STATE = 2
+_HEADER_ACTIVE_TABLE = 3
+_HEADER_GENERATION = 4
+_HEADER_SIZE = 8
+
+_STATE_NOT_READY = 0
+_STATE_READY = 1
+# Left in a file that another one (of another capacity) has replaced.
+_STATE_REPLACED = 2
+
+_SLOT_SIZE = 8
+# Slots hold the packed key + 1, as the RHE 0-0-0 0-0-0 packs to 0.
+_EMPTY_SLOT = 0
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_HASH_MASK = (1 << 64) - 1
+
+# How often a reader tries to map the file again while it is missing or replaced.
+_REOPEN_INTERVAL = 1.0
+
+
+class SeenRheSet:
+    """
+    Packed keys of the RHEs that finished games have had, as an open-addressing hash table in
+    a file mapped into memory by every web worker, so that all of them answer from the same set.
+
+    The worker that holds the lock file writes it from its RHE index: it adds keys in place, and
+    rebuilds the table into the second one when keys go away, then switches readers over.
+    The others only read it, and take over the lock when its holder goes away.
+    `contains` returns None until the set has been written, so that callers can fall back.
+    """
+
+    def __init__(self, path: str, capacity: int) -> None:
+        if capacity < 2 or capacity & (capacity - 1):
+            raise ValueError(f"capacity must be a power of two (capacity = {capacity})")
+
+        self._path = path
+        self._capacity = capacity
+        self._mmap: mmap.mmap | None = None
+        # The mapped file as 64-bit slots.
+        self._slots: memoryview | None = None
+        self._mapped_at = -_REOPEN_INTERVAL
+        self._lock_fd: int | None = None
+        self._is_writer = False
+        # Only kept by the writer, to rebuild the table from.
+        self._keys: set[int] = set()
+
+    @property
+    def is_writer(self) -> bool:
+        return self._is_writer
+
+    def contains(self, key: int) -> bool | None:
+        """Whether a finished game has had the RHE `key`. None if the set is not available."""
+
+        slots = self._get_slots()
+        if slots is None:
+            return None
+
+        capacity = slots[_HEADER_CAPACITY]
+        while True:
+            generation = slots[_HEADER_GENERATION]
+            if slots[_HEADER_STATE] != _STATE_READY:
+                return None
+
+            table = slots[_HEADER_ACTIVE_TABLE]
+            is_found = (
+                slots[self._find_slot(slots, table, capacity, key)] != _EMPTY_SLOT
+            )
+
+            # The table may have been rebuilt in between, if the lookup overlapped two switches.
+            if slots[_HEADER_GENERATION] == generation:
+                return is_found
+
+    def rebuild(self, entries: Mapping[int, RheIndexEntry]) -> None:
+        """
+        Writes the set from the RHE index `entries`, if this worker is (or can become) the writer.
+        Cheap otherwise, so it is also called to take over from a writer that has gone away.
+        """
+
+        if not self._obtain_writer():
+            return
+
+        self._keys = {key for key, entry in entries.items() if entry.final_count}
+        self._publish()
+
+    def apply(self, key: int, entry: RheIndexEntry | None) -> None:
+        """Updates the set with the current RHE index entry of `key`, if this worker is the writer."""
+
+        if not self._is_writer:
+            return
+
+        assert self._slots is not None
+
+        if entry is not None and entry.final_count:
+            if key in self._keys:
+                return
+
+            self._keys.add(key)
+            if (
+                self._slots[_HEADER_STATE] != _STATE_READY
+                or len(self._keys) > self._capacity // 2
+            ):
+                self._publish()
+            else:
+                table = self._slots[_HEADER_ACTIVE_TABLE]
+                self._slots[
+                    self._find_slot(self._slots, table, self._capacity, key)
+                ] = key + 1
+        elif key in self._keys:
+            # Open addressing can't drop a key in place, so the table is rebuilt.
+            self._keys.discard(key)
+            self._publish()
+
+    def close(self) -> None:
+        """Unmaps the file, and lets another worker take over as the writer."""
+
+        self._unmap()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self._is_writer = False
+        self._keys = set()
+
+    def _publish(self) -> None:
+        slots = self._slots
+        assert slots is not None
+
+        if len(self._keys) > self._capacity // 2:
+            if slots[_HEADER_STATE] == _STATE_READY:
+                logger.error(
+                    "%d seen RHEs don't fit in the shared set of capacity %d; "
+                    "workers fall back to their own RHE index",
+                    len(self._keys),
+                    self._capacity,
+                )
+            slots[_HEADER_STATE] = _STATE_NOT_READY
+            return
+
+        assert self._mmap is not None
+
+        # Readers in the middle of a lookup retry once they see the generation move.
+        slots[_HEADER_GENERATION] += 1
+
+        table = 1 - slots[_HEADER_ACTIVE_TABLE]
+        start = (_HEADER_SIZE + table * self._capacity) * _SLOT_SIZE
+        self._mmap[start : start + self._capacity * _SLOT_SIZE] = bytes(
+            self._capacity * _SLOT_SIZE
+        )
+        for key in self._keys:
+            slots[self._find_slot(slots, table, self._capacity, key)] = key + 1
+
+        slots[_HEADER_ACTIVE_TABLE] = table
+        slots[_HEADER_STATE] = _STATE_READY
+        slots[_HEADER_GENERATION] += 1
+
+    def _find_slot(self, slots: memoryview, table: int, capacity: int, key: int) -> int:
+        """Returns the index of the slot holding `key`, or of the empty slot it would go in."""
+
+        value = key + 1
+        offset = _HEADER_SIZE + table * capacity
+        # Fibonacci hashing: the top bits of the product, as many as index the table.
+        index = ((key * _HASH_MULTIPLIER) & _HASH_MASK) >> (65 - capacity.bit_length())
+
+        # Tables are at most half full, so there is always an empty slot to stop at.
+        while (stored := slots[offset + index]) != value and stored != _EMPTY_SLOT:
+            index = (index + 1) & (capacity - 1)
+
+        return offset + index
+
+    def _get_slots(self) -> memoryview | None:
+        if self._slots is not None and self._slots[_HEADER_STATE] != _STATE_REPLACED:
+            return self._slots
+
+        if time.monotonic() - self._mapped_at < _REOPEN_INTERVAL:
+            return None
+        self._mapped_at = time.monotonic()
+
+        self._unmap()
+        try:
+            fd = os.open(self._path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("Failed to open the shared seen RHE set", exc_info=True)
+            return None
+
+        try:
+            size = os.fstat(fd).st_size
+            if size < _HEADER_SIZE * _SLOT_SIZE:
+                return None
+            self._map(mmap.mmap(fd, size, access=mmap.ACCESS_READ))
+        finally:
+            os.close(fd)
+
+        assert self._slots is not None
+        if self._slots[_HEADER_MAGIC] != _MAGIC or size != _get_file_size(
+            self._slots[_HEADER_CAPACITY]
+        ):
+            self._unmap()
+
+        return self._slots
+
+    def _obtain_writer(self) -> bool:
+        if self._is_writer:
+            return True
+
+        try:
+            if self._lock_fd is None:
+                self._lock_fd = os.open(f"{self._path}.lock", os.O_RDWR | os.O_CREAT)
+
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+
+            self._map_for_writing()
+        except OSError:
+            logger.warning("Failed to set up the shared seen RHE set", exc_info=True)
+            return False
+
+        logger.info("Writing the shared seen RHE set at %s", self._path)
+        self._is_writer = True
+        return True
+
+    def _map_for_writing(self) -> None:
+        """Maps the file for writing, replacing it if it does not have the configured capacity."""
+
+        self._unmap()
+        size = _get_file_size(self._capacity)
+
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT)
+        try:
+            current_size = os.fstat(fd).st_size
+            if current_size >= _HEADER_SIZE * _SLOT_SIZE:
+                self._map(mmap.mmap(fd, current_size))
+                assert self._slots is not None
+                if self._slots[_HEADER_MAGIC] == _MAGIC:
+                    if current_size == size:
+                        # Readers keep their mapping; the table is rewritten right after.
+                        return
+                    # Readers map the new file once they see this.
+                    self._slots[_HEADER_STATE] = _STATE_REPLACED
+                self._unmap()
+        finally:
+            os.close(fd)
+
+        # Written aside and renamed over, so that readers never map a half-initialized file.
+        tmp_path = f"{self._path}.tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+        try:
+            os.ftruncate(fd, size)
+            self._map(mmap.mmap(fd, size))
+        finally:
+            os.close(fd)
+
+        assert self._slots is not None
+        self._slots[_HEADER_CAPACITY] = self._capacity
+        self._slots[_HEADER_MAGIC] = _MAGIC
+        os.replace(tmp_path, self._path)
+
+    def _map(self, mapped: mmap.mmap) -> None:
+        self._mmap = mapped
+        self._slots = memoryview(mapped).cast("q")
+
+    def _unmap(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+            self._slots = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def _get_file_size(capacity: int) -> int:
+    return (_HEADER_SIZE + 2 * capacity) * _SLOT_SIZE
@@ -0,0 +1,86 @@
+import asyncio
+import datetime
+import time
+from collections.abc import Iterable
+
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.models.app import TeamModel
+
+
+class TeamRegistry:
+    """
+    In-memory copy of the `team` table, keyed by both the team id and the balldontlie team id.
+    It is loaded on first use and reloaded whenever an unknown team is requested or the copy
+    is older than `reload_interval` seconds, so that renamed teams show up (and change `version`).
+    """
+
+    def __init__(self, reload_interval: float) -> None:
+        self.reload_interval = reload_interval
+        self._teams: dict[int, TeamModel] = {}
+        self._team_ids_by_balldontlie_id: dict[int, int] = {}
+        self._version: datetime.datetime | None = None
+        self._is_loaded = False
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        async with self._lock:
+            teams = (
+                (await AppCtx.current.db.session.execute(sa_exp.select(m.Team)))
+                .scalars()
+                .all()
+            )
+
+            self._teams = {
+                team.id: TeamModel(
+                    id=team.id,
+                    short_name=team.short_name,
+                    name=team.name,
+                )
+                for team in teams
+            }
+            self._team_ids_by_balldontlie_id = {
+                team.balldontlie_id: team.id
+                for team in teams
+                if team.balldontlie_id is not None
+            }
+            self._version = max((team.updated_at for team in teams), default=None)
+            self._is_loaded = True
+            self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(
+        self,
+        *,
+        team_ids: Iterable[int] = (),
+        balldontlie_ids: Iterable[int] = (),
+    ) -> None:
+        """
+        Loads the registry again if it is not loaded yet, is older than `reload_interval`
+        or any of the given teams is unknown.
+        """
+
+        if (
+            not self._is_loaded
+            or time.monotonic() - self._loaded_at > self.reload_interval
+            or any(team_id not in self._teams for team_id in team_ids)
+            or any(
+                balldontlie_id not in self._team_ids_by_balldontlie_id
+                for balldontlie_id in balldontlie_ids
+            )
+        ):
+            await self.load()
+
+    @property
+    def version(self) -> datetime.datetime | None:
+        """The latest `updated_at` among the loaded teams."""
+
+        return self._version
+
+    def get(self, team_id: int) -> TeamModel:
+        return self._teams[team_id]
+
+    def get_id_by_balldontlie_id(self, balldontlie_id: int) -> int:
+        return self._team_ids_by_balldontlie_id[balldontlie_id]
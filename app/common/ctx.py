@@ -3,6 +3,7 @@ from __future__ import annotations
 import contextlib
 import contextvars
 import dataclasses
+import itertools
 import logging
 import uuid
 from collections.abc import AsyncIterator
@@ -15,6 +16,11 @@ from app.common.api_clients.balldontlie import BalldontlieAPI
 from app.common.settings import AppSettings
 
 if TYPE_CHECKING:
+    from .caches.latest_completed_date import LatestCompletedDateCache
+    from .caches.rhe_distribution import RheDistribution
+    from .caches.rhe_index import RheIndex
+    from .caches.seen_rhe_set import SeenRheSet
+    from .caches.team_registry import TeamRegistry
     from .utils.sqla import SqlaEngineAndSession
 
 
@@ -39,9 +45,19 @@ class AppCtx(metaclass=AppCtxMeta):
     db: SqlaEngineAndSession
     balldontlie_api: BalldontlieAPI
     x_api: tweepy.asynchronous.client.AsyncClient
+    rhe_index: RheIndex
+    rhe_distribution: RheDistribution
+    seen_rhes: SeenRheSet
+    latest_completed_date: LatestCompletedDateCache
+    team_registry: TeamRegistry
 
 
 async def create_app_ctx(app_settings: AppSettings) -> AppCtx:
+    from .caches.latest_completed_date import LatestCompletedDateCache
+    from .caches.rhe_distribution import RheDistribution
+    from .caches.rhe_index import RheIndex
+    from .caches.seen_rhe_set import SeenRheSet
+    from .caches.team_registry import TeamRegistry
     from .utils.sqla import SqlaEngineAndSession
 
     ctx = AppCtx(
@@ -51,6 +67,11 @@ async def create_app_ctx(app_settings: AppSettings) -> AppCtx:
         balldontlie_api=BalldontlieAPI(
             url="https://api.balldontlie.io",
             api_key=str(app_settings.BALLDONTLIE_API_KEY),
+            requests_per_minute=app_settings.BALLDONTLIE_REQUESTS_PER_MINUTE,
+            burst=app_settings.BALLDONTLIE_BURST,
+            max_connections=app_settings.BALLDONTLIE_MAX_CONNECTIONS,
+            timeout=app_settings.BALLDONTLIE_TIMEOUT,
+            max_retries=app_settings.BALLDONTLIE_MAX_RETRIES,
         ),
         x_api=tweepy.asynchronous.client.AsyncClient(
             consumer_key=app_settings.X_API_KEY,
@@ -58,6 +79,16 @@ async def create_app_ctx(app_settings: AppSettings) -> AppCtx:
             access_token=app_settings.X_API_ACCESS_TOKEN,
             access_token_secret=app_settings.X_API_ACCESS_TOKEN_SECRET,
         ),
+        rhe_index=RheIndex(),
+        rhe_distribution=RheDistribution(),
+        # The file is only mapped on first use, i.e. by the web workers.
+        seen_rhes=SeenRheSet(
+            app_settings.SEEN_RHE_SET_PATH, app_settings.SEEN_RHE_SET_CAPACITY
+        ),
+        latest_completed_date=LatestCompletedDateCache(),
+        team_registry=TeamRegistry(
+            reload_interval=app_settings.TEAM_REGISTRY_RELOAD_INTERVAL
+        ),
     )
 
     _current_app_ctx_var.set(ctx)
@@ -65,16 +96,22 @@ async def create_app_ctx(app_settings: AppSettings) -> AppCtx:
     return ctx
 
 
+# Only needs to be unique among the contexts bound in this process, as it scopes the DB session.
+_bound_ctx_ids = itertools.count()
+
+
 @contextlib.asynccontextmanager
 async def bind_app_ctx(app_ctx: AppCtx) -> AsyncIterator[None]:
-    ctx = dataclasses.replace(app_ctx, ctx_id=str(uuid.uuid4()))
+    ctx = dataclasses.replace(app_ctx, ctx_id=str(next(_bound_ctx_ids)))
     token = _current_app_ctx_var.set(ctx)
     try:
         yield
     finally:
-        try:
-            await app_ctx.db.clear_scoped_session()
-        except Exception:
-            logger.warning("Failed to clear DB scoped session", exc_info=True)
+        # The scoped session is only created when `db.session` is first used.
+        if app_ctx.db.has_scoped_session():
+            try:
+                await app_ctx.db.clear_scoped_session()
+            except Exception:
+                logger.warning("Failed to clear DB scoped session", exc_info=True)
 
         _current_app_ctx_var.reset(token)
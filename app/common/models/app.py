@@ -7,6 +7,13 @@ class CronTaskEnum(str, enum.Enum):
     game_fetcher = "game_fetcher"
 
 
+class NotifyChannelEnum(str, enum.Enum):
+    game_status_changed = "game_status_changed"
+    games_fetched = "games_fetched"
+    game_classified = "game_classified"
+    game_deleted = "game_deleted"
+
+
 class GameStatusEnum(str, enum.Enum):
     status_scheduled = "STATUS_SCHEDULED"
     status_in_progress = "STATUS_IN_PROGRESS"
@@ -15,6 +22,15 @@ class GameStatusEnum(str, enum.Enum):
     status_rain_delay = "STATUS_RAIN_DELAY"
 
 
+class RheDimensionEnum(str, enum.Enum):
+    away_r = "away_r"
+    away_h = "away_h"
+    away_e = "away_e"
+    home_r = "home_r"
+    home_h = "home_h"
+    home_e = "home_e"
+
+
 class TeamModel(BaseModel):
     id: int
     short_name: str | None
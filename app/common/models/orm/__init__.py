@@ -1,11 +1,16 @@
 from .cursor import Cursor
 from .game import Game
+from .rhe_stats import RheStats
+from .season_stats import SeasonStats, TeamSeasonStats
 from .team import Team
 from .tweet import Tweet
 
 __all__ = [
     "Cursor",
     "Game",
+    "RheStats",
+    "SeasonStats",
     "Team",
+    "TeamSeasonStats",
     "Tweet",
 ]
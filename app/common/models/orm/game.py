@@ -4,19 +4,34 @@ from sqlalchemy import (
     ARRAY,
     DATE,
     TIMESTAMP,
+    BigInteger,
     Boolean,
     CheckConstraint,
     Column,
+    Computed,
     ForeignKey,
     Index,
     Integer,
     String,
 )
+from sqlalchemy.dialects import postgresql as pg_dialect
 from sqlalchemy.orm import Mapped, relationship
 
 from .base_ import OrmBase
 from .team import Team
 
+# Same packing as `app.common.utils.rhe.pack_rhe`, NULL when the RHE does not fit in it.
+RHE_KEY_EXPRESSION = (
+    "CASE WHEN cardinality(rhe) = 6 AND 0 <= ALL(rhe) AND 255 >= ALL(rhe) THEN "
+    "(rhe[1]::bigint << 40) | (rhe[2]::bigint << 32) | (rhe[3]::bigint << 24)"
+    " | (rhe[4]::bigint << 16) | (rhe[5]::bigint << 8) | rhe[6]::bigint "
+    "END"
+)
+
+
+def _get_rhe_component_expression(index: int) -> str:
+    return f"CASE WHEN cardinality(rhe) = 6 THEN rhe[{index + 1}] END"
+
 
 class Game(OrmBase):
     __tablename__ = "game"
@@ -47,13 +62,58 @@ class Game(OrmBase):
     )
 
     box_score: Mapped[list[int] | None] = Column(ARRAY(Integer), nullable=True)
+    # `get_box_score_key(box_score)` and `get_box_score_tokens(box_score)`, written along with
+    # `box_score` through `get_box_score_columns`.
+    box_score_key: Mapped[int | None] = Column(BigInteger, nullable=True)
+    box_score_tokens: Mapped[list[int] | None] = Column(
+        pg_dialect.ARRAY(Integer), nullable=True
+    )
     rhe: Mapped[list[int] | None] = Column(ARRAY(Integer), nullable=True)
+    # Exact RHE lookups go through this key, as comparing arrays is slow.
+    rhe_key: Mapped[int | None] = Column(
+        BigInteger, Computed(RHE_KEY_EXPRESSION, persisted=True), nullable=True
+    )
+    # The RHE components on their own, for partial and range RHE searches.
+    rhe_away_r: Mapped[int | None] = Column(
+        Integer,
+        Computed(_get_rhe_component_expression(0), persisted=True),
+        nullable=True,
+    )
+    rhe_away_h: Mapped[int | None] = Column(
+        Integer,
+        Computed(_get_rhe_component_expression(1), persisted=True),
+        nullable=True,
+    )
+    rhe_away_e: Mapped[int | None] = Column(
+        Integer,
+        Computed(_get_rhe_component_expression(2), persisted=True),
+        nullable=True,
+    )
+    rhe_home_r: Mapped[int | None] = Column(
+        Integer,
+        Computed(_get_rhe_component_expression(3), persisted=True),
+        nullable=True,
+    )
+    rhe_home_h: Mapped[int | None] = Column(
+        Integer,
+        Computed(_get_rhe_component_expression(4), persisted=True),
+        nullable=True,
+    )
+    rhe_home_e: Mapped[int | None] = Column(
+        Integer,
+        Computed(_get_rhe_component_expression(5), persisted=True),
+        nullable=True,
+    )
     status: Mapped[str | None] = Column(String, index=True, nullable=True)
     is_scorhegami: Mapped[bool | None] = Column(Boolean, nullable=True)
+    # Whether the game was the first one with its box score, set along with is_scorhegami.
+    is_unique_box_score: Mapped[bool | None] = Column(Boolean, nullable=True)
+    # 1 for the first ScoRHEgami in history, 2 for the second one, and so on. NULL for other games.
+    scorhegami_ordinal: Mapped[int | None] = Column(Integer, nullable=True)
 
     bref_url: Mapped[str | None] = Column(String, nullable=True)
 
-    game_date: Mapped[datetime.date] = Column(DATE, nullable=False)
+    game_date: Mapped[datetime.date] = Column(DATE, index=True, nullable=False)
 
     __table_args__ = (
         Index(
@@ -65,6 +125,55 @@ class Game(OrmBase):
             postgresql_where=(start_time.isnot(None)),
         ),
         Index("ix_game_box_score", box_score, postgresql_using="gin"),
+        Index("ix_game_box_score_key", box_score_key),
+        Index("ix_game_box_score_tokens", box_score_tokens, postgresql_using="gin"),
         Index("ix_game_rhe", rhe, postgresql_using="gin"),
+        # Also serves plain `rhe_key` equality, with game_date for "most recently on".
+        Index("ix_game_rhe_key_game_date", rhe_key, game_date),
+        # Runs first, so that final score (and score and hits) searches are prefix scans.
+        # Whether other combinations (e.g. `home_h` alone) use it is up to the planner.
+        Index(
+            "ix_game_rhe_components",
+            rhe_away_r,
+            rhe_home_r,
+            rhe_away_h,
+            rhe_home_h,
+            rhe_away_e,
+            rhe_home_e,
+        ),
+        Index("ix_game_updated_at", "updated_at"),
+        # Keyset pagination on (start_time, id), with variants for the common filters.
+        # A single status and either is_scorhegami value have their own index. Several
+        # statuses at once walk ix_game_start_time_id and filter the other statuses out.
+        Index("ix_game_start_time_id", start_time, id),
+        Index("ix_game_status_start_time_id", status, start_time, id),
+        Index(
+            "ix_game_scorhegami_start_time_id",
+            start_time,
+            id,
+            postgresql_where=is_scorhegami.is_(True),
+        ),
+        Index(
+            "ix_game_not_scorhegami_start_time_id",
+            start_time,
+            id,
+            postgresql_where=is_scorhegami.is_(False),
+        ),
+        # Chronological order of the classified games, so that searches over them (e.g.
+        # box score searches) can read matches in order and stop at the page size.
+        Index(
+            "ix_game_classified_chronological",
+            game_date,
+            start_time,
+            id,
+            postgresql_where=is_scorhegami.isnot(None),
+        ),
+        # Not unique, so that inserting an older ScoRHEgami can shift the later ordinals
+        # with a single UPDATE.
+        Index(
+            "ix_game_scorhegami_ordinal",
+            scorhegami_ordinal,
+            postgresql_where=scorhegami_ordinal.isnot(None),
+        ),
         CheckConstraint("home_id != away_id", name="different_teams_constraint"),
     )
@@ -0,0 +1,33 @@
+import datetime
+
+from sqlalchemy import (
+    DATE,
+    BigInteger,
+    Column,
+    ForeignKey,
+    Integer,
+)
+from sqlalchemy.orm import Mapped
+
+from .base_ import OrmBase
+
+
+class RheStats(OrmBase):
+    """
+    Occurrences of every RHE among the classified games (is_scorhegami IS NOT NULL).
+    Maintained by ScorhegamiUpdaterTask in the transaction that classifies the games,
+    and rebuilt by `scripts/rebuild_rhe_stats.py` and `scripts/recompute_scorhegamis.py`.
+    """
+
+    __tablename__ = "rhe_stats"
+
+    # `Game.rhe_key` of the RHE.
+    rhe_key: Mapped[int] = Column(BigInteger, primary_key=True, autoincrement=False)
+
+    count: Mapped[int] = Column(Integer, nullable=False)
+
+    # The first game is the RHE's ScoRHEgami.
+    first_game_id: Mapped[int] = Column(Integer, ForeignKey("game.id"), nullable=False)
+    first_date: Mapped[datetime.date] = Column(DATE, nullable=False)
+    last_game_id: Mapped[int] = Column(Integer, ForeignKey("game.id"), nullable=False)
+    last_date: Mapped[datetime.date] = Column(DATE, nullable=False)
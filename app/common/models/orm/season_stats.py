@@ -0,0 +1,54 @@
+import datetime
+
+from sqlalchemy import (
+    DATE,
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+)
+from sqlalchemy.orm import Mapped
+
+from .base_ import OrmBase
+
+
+class _SeasonStatsColumns:
+    # Classified games (is_scorhegami IS NOT NULL) of the season.
+    game_count: Mapped[int] = Column(Integer, nullable=False)
+    scorhegami_count: Mapped[int] = Column(Integer, nullable=False)
+
+    # `Game.rhe_key` of the season's most common RHE, the smallest one on ties.
+    most_common_rhe_key: Mapped[int | None] = Column(BigInteger, nullable=True)
+    most_common_rhe_count: Mapped[int | None] = Column(Integer, nullable=True)
+
+    # Longest stretch between two consecutive ScoRHEgamis of the season, in days.
+    # NULL with fewer than two ScoRHEgamis.
+    longest_gap_days: Mapped[int | None] = Column(Integer, nullable=True)
+    longest_gap_start: Mapped[datetime.date | None] = Column(DATE, nullable=True)
+    longest_gap_end: Mapped[datetime.date | None] = Column(DATE, nullable=True)
+
+
+class SeasonStats(_SeasonStatsColumns, OrmBase):
+    """
+    Aggregates of every season (the year of the game date) over all games.
+    Its seasons are recomputed by ScorhegamiUpdaterTask in the transaction that classifies their games,
+    and rebuilt from scratch by `scripts/rebuild_season_stats.py`.
+    """
+
+    __tablename__ = "season_stats"
+
+    season: Mapped[int] = Column(Integer, primary_key=True, autoincrement=False)
+
+
+class TeamSeasonStats(_SeasonStatsColumns, OrmBase):
+    """Same as `SeasonStats`, over the games of a single team."""
+
+    __tablename__ = "team_season_stats"
+
+    season: Mapped[int] = Column(Integer, primary_key=True, autoincrement=False)
+    team_id: Mapped[int] = Column(
+        Integer, ForeignKey("team.id"), primary_key=True, autoincrement=False
+    )
+
+    __table_args__ = (Index("ix_team_season_stats_team_id_season", team_id, season),)
@@ -53,3 +53,78 @@ class AppSettings(BaseSettings):
         default="",
         description="Sentry DSN URL",
     )
+
+    RHE_INDEX_REFRESH_INTERVAL: float = Field(
+        default=30,
+        description="Seconds between incremental refreshes of the in-memory RHE index",
+    )
+
+    RHE_INDEX_RELOAD_INTERVAL: float = Field(
+        default=60 * 60,
+        description="Seconds after which the in-memory RHE index is rebuilt from scratch",
+    )
+
+    SEEN_RHE_SET_PATH: str = Field(
+        default="/dev/shm/scorhegami-seen-rhes",
+        description="File of the seen RHE set shared by the web workers of a host",
+    )
+
+    SEEN_RHE_SET_CAPACITY: int = Field(
+        default=2**20,
+        description="Slots of the shared seen RHE set, a power of two; it holds half as many RHEs",
+    )
+
+    TEAM_REGISTRY_RELOAD_INTERVAL: float = Field(
+        default=5 * 60,
+        description="Seconds after which the in-memory team registry is reloaded on its next use",
+    )
+
+    GAME_UPDATER_POLL_INTERVAL: float = Field(
+        default=30,
+        description="Seconds between game updates while games are in progress or about to start",
+    )
+
+    GAME_UPDATER_LOOKAHEAD: float = Field(
+        default=10 * 60,
+        description="Seconds before its start time from which a scheduled game is updated",
+    )
+
+    GAME_UPDATER_IDLE_INTERVAL: float = Field(
+        default=30 * 60,
+        description="Longest wait between game updates while no game is in progress or about to start",
+    )
+
+    GAME_UPDATER_STALE_AFTER: float = Field(
+        default=12 * 60 * 60,
+        description="Seconds after its start time after which a game that has not started is only updated every GAME_UPDATER_IDLE_INTERVAL",
+    )
+
+    BALLDONTLIE_REQUESTS_PER_MINUTE: float = Field(
+        default=60,
+        description="Requests per minute allowed to balldontlie, shared by every task of the process",
+    )
+
+    BALLDONTLIE_BURST: int = Field(
+        default=10,
+        description="Requests that can be sent to balldontlie at once before the rate limit applies",
+    )
+
+    BALLDONTLIE_MAX_CONNECTIONS: int = Field(
+        default=10,
+        description="Size of the balldontlie connection pool, whose connections are kept alive",
+    )
+
+    BALLDONTLIE_TIMEOUT: float = Field(
+        default=10,
+        description="Seconds before a balldontlie request times out",
+    )
+
+    BALLDONTLIE_MAX_RETRIES: int = Field(
+        default=3,
+        description="Retries of a balldontlie request after a timeout, a connection error, a 429 or a 5xx",
+    )
+
+    BALLDONTLIE_STATS_LOG_INTERVAL: float = Field(
+        default=10 * 60,
+        description="Seconds between logs of the balldontlie request, retry and throttling counters in the cron",
+    )
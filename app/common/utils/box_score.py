@@ -0,0 +1,209 @@
+import enum
+import hashlib
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import func as sa_func
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.utils.scorhegami import CHRONOLOGICAL_ORDER
+
+
+def get_box_score_key(box_score: Sequence[int]) -> int:
+    """
+    Hashes a box score into a signed 64-bit integer: the first 8 bytes of the MD5 of its
+    comma-separated values. Postgres computes the same key with
+    `('x' || substr(md5(array_to_string(box_score, ',')), 1, 16))::bit(64)::bigint`.
+    Different box scores may share a key, so matches must still compare `box_score`.
+    """
+
+    digest = hashlib.md5(",".join(map(str, box_score)).encode()).digest()
+    return int.from_bytes(digest[:8], byteorder="big", signed=True)
+
+
+class BoxScoreInning(enum.IntEnum):
+    """Inning codes of the box score tokens that do not refer to a single inning."""
+
+    any = 0
+    all = 255
+
+
+def get_box_score_innings(
+    box_score: Sequence[int],
+) -> tuple[list[int], list[int]] | None:
+    """
+    Splits a box score into the runs of each inning of the away and home teams.
+    The layout is: away innings, away R H E, home innings, home R H E.
+    Returns None if the box score does not follow it.
+    """
+
+    half = len(box_score) // 2
+    if len(box_score) % 2 != 0 or half < 4:
+        return None
+
+    return list(box_score[: half - 3]), list(box_score[half:-3])
+
+
+def get_box_score_token(is_home: bool, inning: int, runs: int) -> int:
+    """
+    Encodes "the team scored `runs` in `inning`" into an integer. `inning` is the inning number
+    starting from 1, or a `BoxScoreInning` for "in some inning" and "in every inning".
+    """
+
+    return (int(is_home) << 16) | (inning << 8) | runs
+
+
+def get_box_score_tokens(box_score: Sequence[int]) -> list[int] | None:
+    """
+    Returns the sorted tokens of every fact `get_box_score_token` can encode about the box score,
+    so that searches are containment queries on a GIN index. Postgres builds the same tokens in
+    the migration that added them.
+    """
+
+    innings = get_box_score_innings(box_score)
+    if innings is None:
+        return None
+
+    tokens: set[int] = set()
+    for is_home, runs_by_inning in enumerate(innings):
+        if any(not 0 <= runs <= 255 for runs in runs_by_inning) or not (
+            0 < len(runs_by_inning) < BoxScoreInning.all
+        ):
+            return None
+
+        for inning, runs in enumerate(runs_by_inning, start=1):
+            tokens.add(get_box_score_token(bool(is_home), inning, runs))
+            tokens.add(get_box_score_token(bool(is_home), BoxScoreInning.any, runs))
+
+        if len(set(runs_by_inning)) == 1:
+            tokens.add(
+                get_box_score_token(
+                    bool(is_home), BoxScoreInning.all, runs_by_inning[0]
+                )
+            )
+
+    return sorted(tokens)
+
+
+def get_box_score_columns(box_score: Sequence[int] | None) -> dict[str, Any]:
+    """
+    Returns the `game` columns derived from `box_score`. Every path that writes `box_score`
+    writes them along with it, so that box score lookups and searches see the same games.
+    """
+
+    if box_score is None:
+        return {"box_score_key": None, "box_score_tokens": None}
+
+    return {
+        "box_score_key": get_box_score_key(box_score),
+        "box_score_tokens": get_box_score_tokens(box_score),
+    }
+
+
+async def classify_box_scores(games: Sequence[m.Game]) -> None:
+    """
+    Sets whether each of the newly classified `games` was the first game with its box score,
+    in the order of `games`. They are expected to come after every classified game;
+    `recompute_unique_box_scores` handles older ones.
+    """
+
+    games = [game for game in games if game.box_score is not None]
+    if not games:
+        return
+
+    for game in games:
+        for name, value in get_box_score_columns(game.box_score).items():
+            setattr(game, name, value)
+
+    # Keys can collide, so the box scores themselves are compared as well.
+    seen_box_scores = {
+        tuple(box_score)
+        for (box_score,) in (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(m.Game.box_score)
+                .where(
+                    m.Game.box_score_key.in_({game.box_score_key for game in games}),
+                    m.Game.is_unique_box_score.isnot(None),
+                )
+                .distinct()
+            )
+        ).all()
+    }
+
+    for game in games:
+        box_score = tuple(game.box_score)
+        game.is_unique_box_score = box_score not in seen_box_scores
+        seen_box_scores.add(box_score)
+
+
+async def backfill_box_score_columns() -> int:
+    """
+    Fills the columns of `get_box_score_columns` for the games that have a box score without them,
+    e.g. games inserted before those columns were written everywhere. Returns their number.
+    """
+
+    games = (
+        await AppCtx.current.db.session.execute(
+            sa_exp.select(m.Game.id, m.Game.box_score).where(
+                m.Game.box_score.isnot(None), m.Game.box_score_key.is_(None)
+            )
+        )
+    ).all()
+
+    if games:
+        # Bulk UPDATE by primary key, sent as a single executemany.
+        await AppCtx.current.db.session.execute(
+            sa_exp.update(m.Game),
+            [
+                {"id": game_id, **get_box_score_columns(box_score)}
+                for game_id, box_score in games
+            ],
+        )
+
+    return len(games)
+
+
+async def recompute_unique_box_scores() -> int:
+    """
+    Sets `is_unique_box_score` of every classified game with a box score from the chronological
+    order, and clears it for the other games. Only the rows whose value changes are written.
+    Returns their number.
+    """
+
+    numbered = (
+        sa_exp.select(
+            m.Game.id,
+            (
+                sa_func.row_number().over(
+                    partition_by=(m.Game.box_score_key, m.Game.box_score),
+                    order_by=CHRONOLOGICAL_ORDER,
+                )
+                == 1
+            ).label("is_unique_box_score"),
+        )
+        .where(m.Game.is_scorhegami.isnot(None), m.Game.box_score_key.isnot(None))
+        .subquery()
+    )
+
+    updated = await AppCtx.current.db.session.execute(
+        sa_exp.update(m.Game)
+        .where(
+            m.Game.id == numbered.c.id,
+            m.Game.is_unique_box_score.is_distinct_from(numbered.c.is_unique_box_score),
+        )
+        .values(is_unique_box_score=numbered.c.is_unique_box_score)
+        .execution_options(synchronize_session=False)
+    )
+    cleared = await AppCtx.current.db.session.execute(
+        sa_exp.update(m.Game)
+        .where(
+            sa_exp.or_(m.Game.is_scorhegami.is_(None), m.Game.box_score_key.is_(None)),
+            m.Game.is_unique_box_score.isnot(None),
+        )
+        .values(is_unique_box_score=None)
+        .execution_options(synchronize_session=False)
+    )
+
+    return updated.rowcount + cleared.rowcount
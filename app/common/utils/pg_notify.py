@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import weakref
+from collections import defaultdict
+from collections.abc import Callable
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import func as sa_func
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models.app import NotifyChannelEnum
+
+logger = logging.getLogger(__name__)
+
+
+_PENDING_NOTIFICATIONS_KEY = "pending_notifications"
+
+# Listeners of this process. They get the notifications sent from this process as soon as
+# the transaction commits, without waiting for Postgres to deliver them back.
+_local_listeners: weakref.WeakSet["PgListener"] = weakref.WeakSet()
+
+
+async def notify(channel: NotifyChannelEnum, payload: str = "") -> None:
+    """
+    Sends a notification on the current session's transaction.
+    Postgres delivers it to the listeners only when the transaction commits.
+    Listeners of this process may get it twice, directly and through Postgres.
+    """
+
+    session = AppCtx.current.db.session
+    await session.execute(sa_exp.select(sa_func.pg_notify(channel.value, payload)))
+
+    session.sync_session.info.setdefault(_PENDING_NOTIFICATIONS_KEY, []).append(
+        (channel.value, payload)
+    )
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _dispatch_pending_notifications(session: Session) -> None:
+    for channel, payload in session.info.pop(_PENDING_NOTIFICATIONS_KEY, []):
+        for listener in _local_listeners:
+            listener._dispatch(channel, payload)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending_notifications(session: Session) -> None:
+    session.info.pop(_PENDING_NOTIFICATIONS_KEY, None)
+
+
+class PgListener:
+    """
+    Listens to Postgres notifications on a dedicated connection and dispatches them to callbacks.
+
+    Notifications sent while the connection is down are lost, so every callback is also
+    called with an empty payload whenever the connection is (re)established or lost.
+    """
+
+    def __init__(self, engine: AsyncEngine, *, reconnect_delay: float = 5.0) -> None:
+        self.engine = engine
+        self.reconnect_delay = reconnect_delay
+
+        self._callbacks: defaultdict[str, list[Callable[[str], None]]] = defaultdict(
+            list
+        )
+
+        _local_listeners.add(self)
+
+    def subscribe(
+        self, channel: NotifyChannelEnum, callback: Callable[[str], None]
+    ) -> None:
+        self._callbacks[channel.value].append(callback)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Postgres listener connection failed", exc_info=True)
+
+            self._dispatch_all()
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _listen(self) -> None:
+        async with self.engine.connect() as conn:
+            driver_conn = (await conn.get_raw_connection()).driver_connection
+
+            terminated = asyncio.Event()
+            driver_conn.add_termination_listener(lambda _: terminated.set())
+
+            for channel in self._callbacks:
+                await driver_conn.add_listener(channel, self._on_notification)
+
+            logger.info("Listening to channels %s", list(self._callbacks))
+            self._dispatch_all()
+
+            await terminated.wait()
+
+    def _on_notification(self, _conn, _pid: int, channel: str, payload: str) -> None:
+        self._dispatch(channel, payload)
+
+    def _dispatch_all(self) -> None:
+        for channel in self._callbacks:
+            self._dispatch(channel, "")
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        for callback in self._callbacks[channel]:
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Failed to handle notification on %s", channel)
@@ -0,0 +1,111 @@
+from collections.abc import Iterator, Sequence
+
+RHE_LENGTH = 6
+
+_COMPONENT_BITS = 8
+_COMPONENT_MAX = (1 << _COMPONENT_BITS) - 1
+
+
+def pack_rhe(rhe: Sequence[int]) -> int:
+    """
+    Packs an RHE score (away R, H, E, home R, H, E) into a single integer.
+    Each component takes one byte with away runs in the most significant one,
+    so packed keys sort the same way as the RHE lists they came from.
+    """
+
+    if len(rhe) != RHE_LENGTH:
+        raise ValueError(f"RHE must have {RHE_LENGTH} values (rhe = {rhe})")
+
+    key = 0
+    for value in rhe:
+        if not 0 <= value <= _COMPONENT_MAX:
+            raise ValueError(f"RHE value out of range (rhe = {rhe})")
+        key = (key << _COMPONENT_BITS) | value
+
+    return key
+
+
+def unpack_rhe(key: int) -> list[int]:
+    return [
+        (key >> (_COMPONENT_BITS * shift)) & _COMPONENT_MAX
+        for shift in range(RHE_LENGTH - 1, -1, -1)
+    ]
+
+
+def iter_keys_at_distance(rhe: Sequence[int], distance: int) -> Iterator[int]:
+    """
+    Yields the packed keys of every RHE at exactly `distance` from `rhe` in L1 distance
+    (the sum of the absolute differences of the six values), in a deterministic order.
+    """
+
+    if len(rhe) != RHE_LENGTH:
+        raise ValueError(f"RHE must have {RHE_LENGTH} values (rhe = {rhe})")
+
+    def _iter(index: int, remaining: int, key: int) -> Iterator[int]:
+        center = rhe[index]
+
+        if index == RHE_LENGTH - 1:
+            for value in (center - remaining, center + remaining):
+                if 0 <= value <= _COMPONENT_MAX:
+                    yield (key << _COMPONENT_BITS) | value
+                if remaining == 0:
+                    break
+            return
+
+        for delta in range(-remaining, remaining + 1):
+            value = center + delta
+            if 0 <= value <= _COMPONENT_MAX:
+                yield from _iter(
+                    index + 1, remaining - abs(delta), (key << _COMPONENT_BITS) | value
+                )
+
+    yield from _iter(0, distance, 0)
+
+
+def iter_keys_above(rhe: Sequence[int], max_increase: int) -> Iterator[tuple[int, int]]:
+    """
+    Yields (packed key, increase) of every RHE that `rhe` can still become by adding up to
+    `max_increase` runs, hits and errors in total, smallest increases first.
+    """
+
+    if len(rhe) != RHE_LENGTH:
+        raise ValueError(f"RHE must have {RHE_LENGTH} values (rhe = {rhe})")
+
+    def _iter(index: int, remaining: int, key: int) -> Iterator[int]:
+        if index == RHE_LENGTH:
+            if remaining == 0:
+                yield key
+            return
+
+        for delta in range(remaining + 1):
+            value = rhe[index] + delta
+            if value <= _COMPONENT_MAX:
+                yield from _iter(
+                    index + 1, remaining - delta, (key << _COMPONENT_BITS) | value
+                )
+
+    for increase in range(max_increase + 1):
+        for key in _iter(0, increase, 0):
+            yield key, increase
+
+
+def parse_rhe_range(value: str) -> tuple[int, int | None]:
+    """
+    Parses an RHE component range: `N` for exactly N, `N-M` for N to M inclusive and `N-` for N or more.
+    Returns (lower bound, upper bound or None when unbounded).
+    """
+
+    lower, separator, upper = value.partition("-")
+    if not lower.isdigit() or (upper and not upper.isdigit()):
+        raise ValueError(f"Invalid RHE range (value = {value})")
+
+    if not separator:
+        return int(lower), int(lower)
+
+    if not upper:
+        return int(lower), None
+
+    if int(upper) < int(lower):
+        raise ValueError(f"Empty RHE range (value = {value})")
+
+    return int(lower), int(upper)
@@ -0,0 +1,77 @@
+from sqlalchemy import func as sa_func
+from sqlalchemy.dialects import postgresql as pg_dialect
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.utils.scorhegami import CHRONOLOGICAL_ORDER
+
+_STATS_COLUMN_NAMES = (
+    "count",
+    "first_game_id",
+    "first_date",
+    "last_game_id",
+    "last_date",
+)
+
+
+async def rebuild_rhe_stats() -> int:
+    """
+    Derives the `rhe_stats` table from the classified games in a single grouped pass,
+    on the current session's transaction. It is locked until the transaction ends,
+    so that ScorhegamiUpdaterTask does not update rows in between.
+    Only the rows whose values change are written. Returns their number.
+    """
+
+    await AppCtx.current.db.session.execute(
+        sa_exp.text("LOCK TABLE rhe_stats IN EXCLUSIVE MODE")
+    )
+
+    classified = sa_exp.and_(
+        m.Game.rhe_key.isnot(None),
+        m.Game.is_scorhegami.isnot(None),
+    )
+    last_to_first = tuple(column.desc().nulls_last() for column in CHRONOLOGICAL_ORDER)
+
+    stats_insert = pg_dialect.insert(m.RheStats).from_select(
+        ["rhe_key", *_STATS_COLUMN_NAMES],
+        sa_exp.select(
+            m.Game.rhe_key,
+            sa_func.count(),
+            sa_func.array_agg(aggregate_order_by(m.Game.id, *CHRONOLOGICAL_ORDER))[1],
+            sa_func.min(m.Game.game_date),
+            sa_func.array_agg(aggregate_order_by(m.Game.id, *last_to_first))[1],
+            sa_func.max(m.Game.game_date),
+        )
+        .where(classified)
+        .group_by(m.Game.rhe_key),
+    )
+    table = m.RheStats.__table__
+    upserted = await AppCtx.current.db.session.execute(
+        stats_insert.on_conflict_do_update(
+            index_elements=["rhe_key"],
+            set_={
+                **{name: stats_insert.excluded[name] for name in _STATS_COLUMN_NAMES},
+                "updated_at": sa_func.now(),
+            },
+            where=sa_exp.tuple_(
+                *(table.c[name] for name in _STATS_COLUMN_NAMES)
+            ).is_distinct_from(
+                sa_exp.tuple_(
+                    *(stats_insert.excluded[name] for name in _STATS_COLUMN_NAMES)
+                )
+            ),
+        )
+    )
+
+    # RHEs left without classified games, e.g. after a score fix.
+    deleted = await AppCtx.current.db.session.execute(
+        sa_exp.delete(m.RheStats).where(
+            m.RheStats.rhe_key.not_in(
+                sa_exp.select(m.Game.rhe_key).where(classified).distinct()
+            )
+        )
+    )
+
+    return upserted.rowcount + deleted.rowcount
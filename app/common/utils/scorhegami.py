@@ -0,0 +1,132 @@
+import dataclasses
+import datetime
+
+from sqlalchemy import func as sa_func
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.utils.rhe import unpack_rhe
+
+# The order in which games happened. ScoRHEgami ordinals count games in this order.
+CHRONOLOGICAL_ORDER = (m.Game.game_date, m.Game.start_time, m.Game.id)
+
+_MIN_START_TIME = datetime.datetime.min.replace(tzinfo=datetime.UTC)
+
+_STREAM_BATCH_SIZE = 10000
+
+
+def get_chronological_key(
+    game_date: datetime.date,
+    start_time: datetime.datetime | None,
+    game_id: int,
+) -> tuple:
+    """Sort key matching `CHRONOLOGICAL_ORDER`, where Postgres sorts NULL start times last."""
+
+    return (game_date, start_time is None, start_time or _MIN_START_TIME, game_id)
+
+
+async def renumber_scorhegami_ordinals() -> int:
+    """
+    Numbers all ScoRHEgamis from 1 in chronological order, and clears the ordinal of other games.
+    Only the rows whose ordinal changes are written. Returns their number.
+    """
+
+    numbered = (
+        sa_exp.select(
+            m.Game.id,
+            sa_func.row_number()
+            .over(order_by=CHRONOLOGICAL_ORDER)
+            .label("scorhegami_ordinal"),
+        )
+        .where(m.Game.is_scorhegami.is_(True))
+        .subquery()
+    )
+
+    renumbered = await AppCtx.current.db.session.execute(
+        sa_exp.update(m.Game)
+        .where(
+            m.Game.id == numbered.c.id,
+            m.Game.scorhegami_ordinal.is_distinct_from(numbered.c.scorhegami_ordinal),
+        )
+        .values(scorhegami_ordinal=numbered.c.scorhegami_ordinal)
+        .execution_options(synchronize_session=False)
+    )
+    cleared = await AppCtx.current.db.session.execute(
+        sa_exp.update(m.Game)
+        .where(
+            m.Game.is_scorhegami.isnot(True),
+            m.Game.scorhegami_ordinal.isnot(None),
+        )
+        .values(scorhegami_ordinal=None)
+        .execution_options(synchronize_session=False)
+    )
+
+    return renumbered.rowcount + cleared.rowcount
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ScorhegamiMismatch:
+    game_id: int
+    rhe: list[int]
+    game_date: datetime.date
+    away_id: int
+    home_id: int
+    is_scorhegami: bool
+    expected: bool
+
+
+async def find_scorhegami_mismatches(
+    *, since: datetime.datetime | None = None
+) -> list[ScorhegamiMismatch]:
+    """
+    Streams the classified games in chronological order and returns the ones whose
+    `is_scorhegami` disagrees with being the first game of their RHE.
+    With `since`, only the RHEs of games updated at or after it are checked.
+    """
+
+    games_query = sa_exp.select(
+        m.Game.id,
+        m.Game.rhe_key,
+        m.Game.game_date,
+        m.Game.away_id,
+        m.Game.home_id,
+        m.Game.is_scorhegami,
+    ).where(
+        m.Game.rhe_key.isnot(None),
+        m.Game.is_scorhegami.isnot(None),
+    )
+
+    if since is not None:
+        games_query = games_query.where(
+            m.Game.rhe_key.in_(
+                sa_exp.select(m.Game.rhe_key).where(m.Game.updated_at >= since)
+            )
+        )
+
+    seen_rhe_keys: set[int] = set()
+    mismatches: list[ScorhegamiMismatch] = []
+
+    games = await AppCtx.current.db.session.stream(
+        games_query.order_by(*CHRONOLOGICAL_ORDER).execution_options(
+            yield_per=_STREAM_BATCH_SIZE
+        )
+    )
+    async for game_id, rhe_key, game_date, away_id, home_id, is_scorhegami in games:
+        expected = rhe_key not in seen_rhe_keys
+        seen_rhe_keys.add(rhe_key)
+
+        if is_scorhegami != expected:
+            mismatches.append(
+                ScorhegamiMismatch(
+                    game_id=game_id,
+                    rhe=unpack_rhe(rhe_key),
+                    game_date=game_date,
+                    away_id=away_id,
+                    home_id=home_id,
+                    is_scorhegami=is_scorhegami,
+                    expected=expected,
+                )
+            )
+
+    return mismatches
@@ -0,0 +1,233 @@
+import datetime
+from collections.abc import Collection
+
+from sqlalchemy import Integer
+from sqlalchemy import func as sa_func
+from sqlalchemy.dialects import postgresql as pg_dialect
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+
+_STATS_COLUMN_NAMES = (
+    "game_count",
+    "scorhegami_count",
+    "most_common_rhe_key",
+    "most_common_rhe_count",
+    "longest_gap_days",
+    "longest_gap_start",
+    "longest_gap_end",
+)
+
+
+def get_season(game_date: datetime.date) -> int:
+    return game_date.year
+
+
+def get_team_seasons(game_date: datetime.date, *team_ids: int) -> list[tuple[int, int]]:
+    """Returns the (season, team_id) keys of the `team_season_stats` rows a game counts in."""
+
+    return [(get_season(game_date), team_id) for team_id in team_ids]
+
+
+async def refresh_season_stats(
+    team_seasons: Collection[tuple[int, int]] | None,
+) -> int:
+    """
+    Recomputes the `team_season_stats` rows of the (season, team_id) pairs `team_seasons`,
+    and the `season_stats` rows of their seasons (every row if None), from their classified games,
+    on the current session's transaction. Only those teams' games are read for the team rows,
+    and the seasons' games for the season rows. Rows whose values do not change are not written,
+    so that their `updated_at` stays put. Returns the number of rows written.
+    Callers hold AdvisoryLockScorhegamiUpdaterTask, so that refreshes do not interleave.
+    """
+
+    if team_seasons is not None and not team_seasons:
+        return 0
+
+    season_column = sa_func.extract("year", m.Game.game_date).cast(Integer)
+
+    season_condition = sa_exp.true()
+    if team_seasons is not None:
+        season_condition = sa_exp.or_(
+            *(
+                m.Game.game_date.between(
+                    datetime.date(season, 1, 1), datetime.date(season, 12, 31)
+                )
+                for season in {season for season, _ in team_seasons}
+            )
+        )
+
+    def _select_games(team_id: sa_exp.ColumnElement[int] | None) -> sa_exp.Select:
+        games_query = sa_exp.select(
+            season_column.label("season"),
+            *([team_id.label("team_id")] if team_id is not None else []),
+            m.Game.id,
+            m.Game.game_date,
+            m.Game.start_time,
+            m.Game.rhe_key,
+            m.Game.is_scorhegami,
+        ).where(m.Game.is_scorhegami.isnot(None), season_condition)
+
+        if team_id is not None and team_seasons is not None:
+            games_query = games_query.where(
+                sa_exp.tuple_(season_column, team_id).in_(list(team_seasons))
+            )
+
+        return games_query
+
+    # CTEs, so that the games are read once per statement.
+    league_games = _select_games(None).cte("league_games")
+    # Every game counts for both of its teams.
+    team_games = sa_exp.union_all(
+        _select_games(m.Game.away_id),
+        _select_games(m.Game.home_id),
+    ).cte("team_games")
+
+    touched_seasons = None
+    if team_seasons is not None:
+        touched_seasons = {(season,) for season, _ in team_seasons}
+
+    written_cnt = 0
+    for stats_model, games, key_names, touched_keys in (
+        (m.SeasonStats, league_games, ("season",), touched_seasons),
+        (m.TeamSeasonStats, team_games, ("season", "team_id"), team_seasons),
+    ):
+        table = stats_model.__table__
+        key_columns = sa_exp.tuple_(*(table.c[name] for name in key_names))
+
+        stats = _select_season_stats(games, key_names).subquery()
+        stats_insert = pg_dialect.insert(stats_model).from_select(
+            [*key_names, *_STATS_COLUMN_NAMES],
+            sa_exp.select(*stats.c),
+        )
+        upserted = await AppCtx.current.db.session.execute(
+            stats_insert.on_conflict_do_update(
+                index_elements=key_names,
+                set_={
+                    **{
+                        name: stats_insert.excluded[name]
+                        for name in _STATS_COLUMN_NAMES
+                    },
+                    "updated_at": sa_func.now(),
+                },
+                where=sa_exp.tuple_(
+                    *(table.c[name] for name in _STATS_COLUMN_NAMES)
+                ).is_distinct_from(
+                    sa_exp.tuple_(
+                        *(stats_insert.excluded[name] for name in _STATS_COLUMN_NAMES)
+                    )
+                ),
+            )
+        )
+
+        # Rows left without classified games, e.g. after a game date fix.
+        stats_delete = sa_exp.delete(stats_model).where(
+            key_columns.not_in(
+                sa_exp.select(*(games.c[name] for name in key_names)).distinct()
+            )
+        )
+        if touched_keys is not None:
+            stats_delete = stats_delete.where(key_columns.in_(list(touched_keys)))
+        deleted = await AppCtx.current.db.session.execute(stats_delete)
+
+        written_cnt += upserted.rowcount + deleted.rowcount
+
+    return written_cnt
+
+
+def _select_season_stats(
+    games: sa_exp.CTE, key_names: tuple[str, ...]
+) -> sa_exp.Select:
+    keys = [games.c[name] for name in key_names]
+
+    counts = (
+        sa_exp.select(
+            *keys,
+            sa_func.count().label("game_count"),
+            sa_func.count()
+            .filter(games.c.is_scorhegami.is_(True))
+            .label("scorhegami_count"),
+        )
+        .group_by(*keys)
+        .subquery()
+    )
+
+    rhe_counts = (
+        sa_exp.select(*keys, games.c.rhe_key, sa_func.count().label("count"))
+        .where(games.c.rhe_key.isnot(None))
+        .group_by(*keys, games.c.rhe_key)
+        .subquery()
+    )
+    most_common_rhes = (
+        sa_exp.select(
+            *(rhe_counts.c[name] for name in key_names),
+            sa_func.array_agg(
+                aggregate_order_by(
+                    rhe_counts.c.rhe_key,
+                    rhe_counts.c.count.desc(),
+                    rhe_counts.c.rhe_key,
+                )
+            )[1].label("rhe_key"),
+            sa_func.max(rhe_counts.c.count).label("count"),
+        )
+        .group_by(*(rhe_counts.c[name] for name in key_names))
+        .subquery()
+    )
+
+    # Days since the previous ScoRHEgami, NULL for the first one.
+    scorhegami_gaps = (
+        sa_exp.select(
+            *keys,
+            games.c.game_date,
+            (
+                games.c.game_date
+                - sa_func.lag(games.c.game_date).over(
+                    partition_by=keys,
+                    order_by=(games.c.game_date, games.c.start_time, games.c.id),
+                )
+            ).label("gap"),
+        )
+        .where(games.c.is_scorhegami.is_(True))
+        .subquery()
+    )
+    longest_gaps = (
+        sa_exp.select(
+            *(scorhegami_gaps.c[name] for name in key_names),
+            sa_func.max(scorhegami_gaps.c.gap).label("days"),
+            sa_func.array_agg(
+                aggregate_order_by(
+                    scorhegami_gaps.c.game_date,
+                    scorhegami_gaps.c.gap.desc(),
+                    scorhegami_gaps.c.game_date,
+                )
+            )[1].label("end"),
+        )
+        .where(scorhegami_gaps.c.gap.isnot(None))
+        .group_by(*(scorhegami_gaps.c[name] for name in key_names))
+        .subquery()
+    )
+
+    return sa_exp.select(
+        *(counts.c[name] for name in key_names),
+        counts.c.game_count,
+        counts.c.scorhegami_count,
+        most_common_rhes.c.rhe_key,
+        most_common_rhes.c.count,
+        longest_gaps.c.days,
+        longest_gaps.c.end - longest_gaps.c.days,
+        longest_gaps.c.end,
+    ).select_from(
+        counts.outerjoin(
+            most_common_rhes,
+            sa_exp.and_(
+                *(counts.c[name] == most_common_rhes.c[name] for name in key_names)
+            ),
+        ).outerjoin(
+            longest_gaps,
+            sa_exp.and_(
+                *(counts.c[name] == longest_gaps.c[name] for name in key_names)
+            ),
+        )
+    )
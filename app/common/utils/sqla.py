@@ -49,6 +49,9 @@ class SqlaEngineAndSession:
     def session(self) -> AsyncSession:
         return self._scoped_session()
 
+    def has_scoped_session(self) -> bool:
+        return self._scoped_session.registry.has()
+
     async def clear_scoped_session(self) -> None:
         await self._scoped_session.remove()
 
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
 import signal
 import sys
 import threading
+import time
 from types import FrameType
 
 import sentry_sdk
 from sentry_sdk.integrations.logging import LoggingIntegration
 
-from app.common.ctx import create_app_ctx
+from app.common.ctx import AppCtx, create_app_ctx
 from app.common.settings import AppSettings
+from app.common.utils.pg_notify import PgListener
 from app.cron.tasks import TASK_CLS_LIST
 from app.cron.tasks.base import AsyncComponent
 
@@ -59,25 +62,47 @@ class CronApp:
     async def _run(self) -> None:
         app_ctx = await create_app_ctx(self.app_settings)
 
+        # Runs a task as soon as the task before it in the pipeline has committed its work.
+        pg_listener = PgListener(app_ctx.db.engine)
+        pg_listener_task: asyncio.Task | None = None
+
         try:
             started_components: list[AsyncComponent] = []
             for task_cls in TASK_CLS_LIST:
                 task_instance = task_cls(app_ctx)
+                task_instance.subscribe(pg_listener)
                 await task_instance.start()
 
                 logger.info("Start %s", task_cls.__name__)
 
                 started_components.append(task_instance)
 
+            pg_listener_task = asyncio.create_task(pg_listener.run())
+
+            stats_logged_at = time.monotonic()
             while not self._terminate_event.is_set() and all(
                 component.is_healthy() for component in started_components
             ):
                 await asyncio.sleep(0.1)
 
+                if (
+                    time.monotonic() - stats_logged_at
+                    >= self.app_settings.BALLDONTLIE_STATS_LOG_INTERVAL
+                ):
+                    self._log_api_stats(app_ctx)
+                    stats_logged_at = time.monotonic()
+
         except Exception:
             logger.warning("exception from components", exc_info=True)
 
         finally:
+            self._log_api_stats(app_ctx)
+
+            if pg_listener_task is not None:
+                pg_listener_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await pg_listener_task
+
             for component in reversed(started_components):
                 try:
                     await component.stop()
@@ -87,3 +112,14 @@ class CronApp:
                         component.__class__.__name__,
                         exc_info=True,
                     )
+
+    def _log_api_stats(self, app_ctx: AppCtx) -> None:
+        stats = app_ctx.balldontlie_api.stats
+        logger.info(
+            "balldontlie API since start: %d requests, %d retries, "
+            "%d throttled for %.1fs in total",
+            stats.request_cnt,
+            stats.retry_cnt,
+            stats.throttled_cnt,
+            stats.throttled_seconds,
+        )
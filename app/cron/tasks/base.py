@@ -1,4 +1,10 @@
+from app.common.utils.pg_notify import PgListener
+
+
 class AsyncComponent:
+    def subscribe(self, pg_listener: PgListener) -> None:
+        """Subscribes to the notifications the component reacts to. Called before `start`."""
+
     async def start(self) -> None:
         pass
 
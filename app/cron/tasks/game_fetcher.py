@@ -1,5 +1,6 @@
 import asyncio
 import datetime
+import itertools
 import logging
 from typing import Any, cast
 
@@ -13,7 +14,8 @@ from sqlalchemy.sql import expression as sa_exp
 from app.common.api_clients.balldontlie import MLBGame
 from app.common.ctx import AppCtx, bind_app_ctx
 from app.common.models import orm as m
-from app.common.models.app import CronTaskEnum
+from app.common.models.app import CronTaskEnum, NotifyChannelEnum
+from app.common.utils.pg_notify import notify
 
 from .base import AsyncComponent
 
@@ -105,14 +107,25 @@ class GameFetcherTask(AsyncComponent):
                     await AppCtx.current.db.session.commit()
                     return
 
+                team_registry = AppCtx.current.team_registry
+                await team_registry.ensure_loaded(
+                    balldontlie_ids=itertools.chain.from_iterable(
+                        (game.away_team.id, game.home_team.id) for game in valid_games
+                    )
+                )
+
                 result = await AppCtx.current.db.session.execute(
                     pg_dialect.insert(m.Game)
                     .values(
                         [
                             {
                                 "balldontlie_id": game.id,
-                                "away_id": await self._get_team_id(game.away_team.id),
-                                "home_id": await self._get_team_id(game.home_team.id),
+                                "away_id": team_registry.get_id_by_balldontlie_id(
+                                    game.away_team.id
+                                ),
+                                "home_id": team_registry.get_id_by_balldontlie_id(
+                                    game.home_team.id
+                                ),
                                 "start_time": dateutil.parser.parse(game.date),
                                 "end_time": None,
                                 "box_score": None,
@@ -127,10 +140,12 @@ class GameFetcherTask(AsyncComponent):
                     )
                     .on_conflict_do_nothing(index_elements=[m.Game.balldontlie_id])
                 )
-                logger.info(
-                    "Inserted %d new games",
-                    cast(CursorResult[Any], result).rowcount,
-                )
+                inserted_cnt = cast(CursorResult[Any], result).rowcount
+                logger.info("Inserted %d new games", inserted_cnt)
+
+                if inserted_cnt:
+                    await notify(NotifyChannelEnum.game_status_changed)
+                    await notify(NotifyChannelEnum.games_fetched)
 
                 await AppCtx.current.db.session.commit()
 
@@ -153,15 +168,6 @@ class GameFetcherTask(AsyncComponent):
             if next_cursor is None:
                 return game_list
 
-    async def _get_team_id(self, balldontlie_team_id: int) -> int:
-        return (
-            await AppCtx.current.db.session.execute(
-                sa_exp.select(m.Team.id).where(
-                    m.Team.balldontlie_id == balldontlie_team_id
-                )
-            )
-        ).scalar_one()
-
     def _get_dates_between(
         self,
         start_timestamp: datetime.datetime,
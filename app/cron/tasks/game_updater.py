@@ -1,16 +1,22 @@
 import asyncio
+import contextlib
 import datetime
 import logging
+from typing import Any
 
 import dateutil
 import dateutil.parser
 import httpx
+from sqlalchemy import func as sa_func
+from sqlalchemy.engine import Row
 from sqlalchemy.sql import expression as sa_exp
 
 from app.common.api_clients.balldontlie import BalldontlieAPI, MLBGame
 from app.common.ctx import AppCtx, bind_app_ctx
 from app.common.models import orm as m
-from app.common.models.app import GameStatusEnum
+from app.common.models.app import GameStatusEnum, NotifyChannelEnum
+from app.common.utils.box_score import get_box_score_columns
+from app.common.utils.pg_notify import PgListener, notify
 
 from .base import AsyncComponent
 
@@ -19,12 +25,37 @@ logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
+_LIVE_STATUSES = (GameStatusEnum.status_in_progress, GameStatusEnum.status_rain_delay)
+
+# The columns the fetched results are compared with, to only write the games that changed.
+_GAME_STATE_COLUMNS = (
+    m.Game.id,
+    m.Game.balldontlie_id,
+    m.Game.game_date,
+    m.Game.start_time,
+    m.Game.status,
+    m.Game.box_score,
+    m.Game.rhe,
+)
+
+# Largest page balldontlie allows.
+_LIST_PAGE_SIZE = 100
+
 
 class GameUpdaterTask(AsyncComponent):
     def __init__(self, app_ctx: AppCtx) -> None:
         self.app_ctx = app_ctx
 
         self._game_updater_task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        # Last time the games that are stuck before their start (or have none) were updated.
+        self._last_idle_update: datetime.datetime | None = None
+
+    def subscribe(self, pg_listener: PgListener) -> None:
+        # Newly fetched games may start before the next scheduled update.
+        pg_listener.subscribe(
+            NotifyChannelEnum.games_fetched, lambda _: self._wakeup.set()
+        )
 
     async def start(self) -> None:
         self._game_updater_task = asyncio.create_task(self._run())
@@ -45,95 +76,286 @@ class GameUpdaterTask(AsyncComponent):
 
     async def _run(self) -> None:
         while True:
-            await self._run_internal()
+            self._wakeup.clear()
+            delay = await self._run_internal()
+
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+
+    async def _run_internal(self) -> float:
+        """Updates the games that are due, and returns the number of seconds until the next update."""
 
-            await asyncio.sleep(60)
+        delay = self.app_ctx.settings.GAME_UPDATER_POLL_INTERVAL
 
-    async def _run_internal(self) -> None:
         try:
             async with bind_app_ctx(self.app_ctx):
-                ongoing_game_ids = (
-                    await AppCtx.current.db.session.execute(
-                        sa_exp.select(m.Game.id, m.Game.balldontlie_id).where(
-                            m.Game.status != GameStatusEnum.status_final,
-                            m.Game.status != GameStatusEnum.status_postponed,
-                        )
-                    )
-                ).all()
+                ongoing_games, delay = await self._get_due_games(
+                    datetime.datetime.now(tz=datetime.UTC)
+                )
 
                 await AppCtx.current.db.session.close()
 
-                if not ongoing_game_ids:
-                    return
+                if not ongoing_games:
+                    return delay
 
-                logger.info("Updating %d games", len(ongoing_game_ids))
+                logger.info("Updating %d games", len(ongoing_games))
 
                 try:
                     game_results = await asyncio.wait_for(
                         self._fetch_all_game_results(
-                            [balldontlie_id for _, balldontlie_id in ongoing_game_ids],
+                            [
+                                (game.balldontlie_id, game.game_date)
+                                for game in ongoing_games
+                            ],
                             AppCtx.current.balldontlie_api,
                         ),
                         timeout=60,
                     )
                 except TimeoutError:
                     logger.exception("Timeout error when updating games")
-                    return
+                    return delay
 
                 now = datetime.datetime.now(tz=datetime.UTC)
+                is_status_changed = False
+                changed_games: list[dict[str, Any]] = []
+                deleted_game_ids: list[int] = []
 
-                for (game_id, balldontlie_id), result in zip(
-                    ongoing_game_ids, game_results
-                ):
+                for game, result in zip(ongoing_games, game_results):
                     if isinstance(result, httpx.HTTPStatusError):
                         if result.response.status_code == 404:
                             logger.warning(
                                 "Deleting game id %d due to NotFoundError",
-                                game_id,
+                                game.id,
                             )
                             await AppCtx.current.db.session.execute(
-                                sa_exp.delete(m.Game).where(m.Game.id == game_id)
+                                sa_exp.delete(m.Game).where(m.Game.id == game.id)
                             )
+                            deleted_game_ids.append(game.id)
+                            is_status_changed = True
                             continue
                         else:
                             logger.error(
-                                f"Failed to get game result (id = {game_id}, balldontlie_id = {balldontlie_id}): "
+                                f"Failed to get game result (id = {game.id}, balldontlie_id = {game.balldontlie_id}): "
                                 f"message={result}, status_code={result.response.status_code}, response={result.response}"
                             )
                             continue
                     elif isinstance(result, Exception):
                         logger.error(
                             "Unexpected exception while getting result of game id %d",
-                            game_id,
+                            game.id,
                         )
                         continue
 
+                    start_time = dateutil.parser.parse(result.date)
                     box_score, rhe = self._get_boxscore_and_rhe(result)
-                    await AppCtx.current.db.session.execute(
-                        sa_exp.update(m.Game)
-                        .values(
-                            start_time=dateutil.parser.parse(result.date),
-                            end_time=now
+
+                    # Unchanged games are not written, so that their updated_at stays put.
+                    if (start_time, result.status, box_score, rhe) == (
+                        game.start_time,
+                        game.status,
+                        game.box_score,
+                        game.rhe,
+                    ):
+                        continue
+
+                    changed_games.append(
+                        {
+                            "id": game.id,
+                            "start_time": start_time,
+                            "end_time": now
                             if result.status == GameStatusEnum.status_final
                             else None,
-                            status=result.status,
-                            box_score=box_score,
-                            rhe=rhe,
-                        )
-                        .where(m.Game.balldontlie_id == result.id)
+                            "status": result.status,
+                            "box_score": box_score,
+                            **get_box_score_columns(box_score),
+                            "rhe": rhe,
+                        }
+                    )
+
+                    if result.status != game.status:
+                        is_status_changed = True
+
+                if changed_games:
+                    logger.info("Writing %d changed games", len(changed_games))
+                    await self._update_games(changed_games)
+
+                if deleted_game_ids:
+                    await notify(
+                        NotifyChannelEnum.game_deleted,
+                        ",".join(str(game_id) for game_id in deleted_game_ids),
                     )
+                if is_status_changed:
+                    await notify(NotifyChannelEnum.game_status_changed)
 
                 await AppCtx.current.db.session.commit()
 
         except Exception:
             logger.exception(f"Failed to run {self.__class__.__name__}")
 
+        return delay
+
+    async def _get_due_games(self, now: datetime.datetime) -> tuple[list[Row], float]:
+        """
+        Returns the games to update now, with their current state, and the number of seconds
+        until the next update.
+
+        Games in progress and games from GAME_UPDATER_LOOKAHEAD before their start time are updated every
+        GAME_UPDATER_POLL_INTERVAL. Games that are still not in progress GAME_UPDATER_STALE_AFTER past their
+        start time (or have none) are only updated every GAME_UPDATER_IDLE_INTERVAL, and later games not at all.
+        When no game is active, the next update is when the next game comes within the lookahead.
+        """
+
+        settings = AppCtx.current.settings
+        lookahead_until = now + datetime.timedelta(
+            seconds=settings.GAME_UPDATER_LOOKAHEAD
+        )
+        stale_before = now - datetime.timedelta(
+            seconds=settings.GAME_UPDATER_STALE_AFTER
+        )
+        is_idle_update = (
+            self._last_idle_update is None
+            or (now - self._last_idle_update).total_seconds()
+            >= settings.GAME_UPDATER_IDLE_INTERVAL
+        )
+
+        is_pending = sa_exp.and_(
+            m.Game.status != GameStatusEnum.status_final,
+            m.Game.status != GameStatusEnum.status_postponed,
+        )
+        is_active = sa_exp.or_(
+            m.Game.status.in_(_LIVE_STATUSES),
+            m.Game.start_time.between(stale_before, lookahead_until),
+        )
+        is_due = is_active
+        if is_idle_update:
+            is_due = sa_exp.or_(
+                is_active,
+                m.Game.start_time.is_(None),
+                m.Game.start_time < stale_before,
+            )
+
+        games = (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(*_GAME_STATE_COLUMNS, is_active.label("is_active")).where(
+                    is_pending, is_due
+                )
+            )
+        ).all()
+
+        if is_idle_update:
+            self._last_idle_update = now
+
+        if any(game.is_active for game in games):
+            delay = settings.GAME_UPDATER_POLL_INTERVAL
+        else:
+            assert self._last_idle_update is not None
+            delay = settings.GAME_UPDATER_IDLE_INTERVAL - (
+                (now - self._last_idle_update).total_seconds()
+            )
+
+            next_start_time = (
+                await AppCtx.current.db.session.execute(
+                    sa_exp.select(sa_func.min(m.Game.start_time)).where(
+                        is_pending, m.Game.start_time > lookahead_until
+                    )
+                )
+            ).scalar()
+            if next_start_time is not None:
+                delay = min(
+                    delay,
+                    (next_start_time - lookahead_until).total_seconds(),
+                )
+
+            delay = max(delay, settings.GAME_UPDATER_POLL_INTERVAL)
+
+        return list(games), delay
+
+    async def _update_games(self, changed_games: list[dict[str, Any]]) -> None:
+        """Writes the changed games with a single UPDATE ... FROM (VALUES ...) statement."""
+
+        column_names = list(changed_games[0])
+        changes = sa_exp.values(
+            *(
+                sa_exp.column(name, m.Game.__table__.c[name].type)
+                for name in column_names
+            ),
+            name="changes",
+        ).data([tuple(game[name] for name in column_names) for game in changed_games])
+
+        await AppCtx.current.db.session.execute(
+            sa_exp.update(m.Game)
+            .where(m.Game.id == changes.c.id)
+            # Cast back, as a column of only NULLs in VALUES is typed as text.
+            .values(
+                {
+                    name: sa_exp.cast(changes.c[name], m.Game.__table__.c[name].type)
+                    for name in column_names
+                    if name != "id"
+                }
+            )
+        )
+
     async def _fetch_all_game_results(
-        self, game_ids: list[int], api: BalldontlieAPI
+        self, games: list[tuple[int, datetime.date]], api: BalldontlieAPI
     ) -> list[MLBGame | Exception]:
-        coroutines = [self._fetch_game_result(game_id, api) for game_id in game_ids]
+        """
+        Returns the results of the (balldontlie id, game date) `games`, in the same order.
+        They are listed by date, a page of up to 100 games per request. Only the games missing
+        from the list (e.g. deleted ones, or ones listed under another date) are fetched one by one.
+        """
+
+        game_ids = [game_id for game_id, _ in games]
+        results: dict[int, MLBGame | Exception] = {}
+
+        dates = sorted({game_date.isoformat() for _, game_date in games})
+        try:
+            listed_games = await self._fetch_games_for_dates(dates, api)
+        except Exception:
+            logger.warning(
+                "Failed to list games for dates %s, fetching them one by one",
+                dates,
+                exc_info=True,
+            )
+        else:
+            wanted_ids = set(game_ids)
+            results.update(
+                (result.id, result)
+                for result in listed_games
+                if result.id in wanted_ids
+            )
+
+        missing_ids = [game_id for game_id in game_ids if game_id not in results]
+        if missing_ids:
+            logger.info("Fetching %d unlisted games one by one", len(missing_ids))
+            results.update(
+                zip(
+                    missing_ids,
+                    await asyncio.gather(
+                        *(
+                            self._fetch_game_result(game_id, api)
+                            for game_id in missing_ids
+                        )
+                    ),
+                )
+            )
+
+        return [results[game_id] for game_id in game_ids]
 
-        return await asyncio.gather(*coroutines)
+    async def _fetch_games_for_dates(
+        self, dates: list[str], api: BalldontlieAPI
+    ) -> list[MLBGame]:
+        game_list = []
+        next_cursor = None
+
+        while True:
+            list_resp = await api.get_mlb_games(
+                cursor=next_cursor, per_page=_LIST_PAGE_SIZE, dates=dates
+            )
+            game_list.extend(list_resp.data)
+            next_cursor = list_resp.meta.next_cursor
+
+            if next_cursor is None:
+                return game_list
 
     async def _fetch_game_result(
         self, game_id: int, api: BalldontlieAPI
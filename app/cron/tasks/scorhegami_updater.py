@@ -1,13 +1,28 @@
 import asyncio
+import contextlib
+import datetime
+import itertools
 import logging
+from collections.abc import Sequence
 
-from sqlalchemy import func as sa_func
-from sqlalchemy import orm as sa_orm
 from sqlalchemy.sql import expression as sa_exp
 
 from app.common.ctx import AppCtx, bind_app_ctx
 from app.common.models import orm as m
-from app.common.models.app import GameStatusEnum, TweetStatusEnum
+from app.common.models.app import GameStatusEnum, NotifyChannelEnum, TweetStatusEnum
+from app.common.utils.box_score import classify_box_scores
+from app.common.utils.pg_notify import PgListener, notify
+from app.common.utils.rhe import pack_rhe
+from app.common.utils.scorhegami import (
+    CHRONOLOGICAL_ORDER,
+    get_chronological_key,
+    renumber_scorhegami_ordinals,
+)
+from app.common.utils.season_stats import get_team_seasons, refresh_season_stats
+from app.common.utils.sqla import (
+    AdvisoryLockScorhegamiUpdaterTask,
+    obtain_advisory_lock,
+)
 
 from .base import AsyncComponent
 
@@ -19,6 +34,13 @@ class ScorhegamiUpdaterTask(AsyncComponent):
         self.app_ctx = app_ctx
 
         self._scorhegami_updater_task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def subscribe(self, pg_listener: PgListener) -> None:
+        # Games are classified as soon as they become final.
+        pg_listener.subscribe(
+            NotifyChannelEnum.game_status_changed, lambda _: self._wakeup.set()
+        )
 
     async def start(self) -> None:
         self._scorhegami_updater_task = asyncio.create_task(self._run())
@@ -39,26 +61,27 @@ class ScorhegamiUpdaterTask(AsyncComponent):
 
     async def _run(self) -> None:
         while True:
+            self._wakeup.clear()
             await self._run_internal()
 
-            await asyncio.sleep(60)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=60)
 
     async def _run_internal(self) -> None:
         try:
             async with bind_app_ctx(self.app_ctx):
+                # Also taken by scripts/recompute_scorhegamis.py.
+                await obtain_advisory_lock(AdvisoryLockScorhegamiUpdaterTask())
+
                 games_in_final = (
                     (
                         await AppCtx.current.db.session.execute(
                             sa_exp.select(m.Game)
-                            .options(
-                                sa_orm.joinedload(m.Game.away_team),
-                                sa_orm.joinedload(m.Game.home_team),
-                            )
                             .where(
                                 m.Game.status == GameStatusEnum.status_final,
                                 m.Game.is_scorhegami.is_(None),
                             )
-                            .order_by(m.Game.end_time.asc())
+                            .order_by(*CHRONOLOGICAL_ORDER)
                         )
                     )
                     .scalars()
@@ -72,39 +95,225 @@ class ScorhegamiUpdaterTask(AsyncComponent):
                     "Updating %d games that have just ended.", len(games_in_final)
                 )
 
+                await AppCtx.current.team_registry.ensure_loaded(
+                    team_ids=itertools.chain.from_iterable(
+                        (game.away_id, game.home_id) for game in games_in_final
+                    )
+                )
+
+                rhe_stats = await self._get_rhe_stats(games_in_final)
+
+                # (game, number of games with its RHE so far, most recent prior date)
+                classified_games: list[tuple[m.Game, int, datetime.date | None]] = []
+                # Former ScoRHEgamis that turned out to have an older game with their RHE.
+                displaced_games: list[m.Game] = []
+
+                # In chronological order, so that the first of several games of this batch
+                # with the same new RHE is the ScoRHEgami and the others count it as prior.
                 for game in games_in_final:
-                    rhe_cnt = (
-                        await AppCtx.current.db.session.execute(
-                            sa_exp.select(sa_func.count())
-                            .select_from(m.Game)
-                            .where(m.Game.rhe == game.rhe)
+                    rhe_key = pack_rhe(game.rhe)
+                    stats = rhe_stats.get(rhe_key)
+
+                    game.is_scorhegami = stats is None
+                    if stats is None:
+                        classified_games.append((game, 1, None))
+
+                        stats = rhe_stats[rhe_key] = m.RheStats(
+                            rhe_key=rhe_key,
+                            count=1,
+                            first_game_id=game.id,
+                            first_date=game.game_date,
+                            last_game_id=game.id,
+                            last_date=game.game_date,
+                        )
+                        AppCtx.current.db.session.add(stats)
+                        continue
+
+                    stats.count += 1
+
+                    # A backfilled game can be older than the first game with its RHE, and
+                    # then takes its place as the ScoRHEgami. Same-day games are told apart
+                    # by their chronological key.
+                    key = get_chronological_key(
+                        game.game_date, game.start_time, game.id
+                    )
+                    if game.game_date < stats.first_date or (
+                        game.game_date == stats.first_date
+                        and key < await self._get_chronological_key(stats.first_game_id)
+                    ):
+                        displaced_game = await AppCtx.current.db.session.get(
+                            m.Game, stats.first_game_id
                         )
-                    ).scalar_one()
+                        assert displaced_game is not None
+                        logger.info(
+                            "Game id %d is older than game id %d, and replaces it "
+                            "as the ScoRHEgami of its RHE",
+                            game.id,
+                            displaced_game.id,
+                        )
+                        displaced_game.is_scorhegami = False
+                        displaced_game.scorhegami_ordinal = None
+                        displaced_games.append(displaced_game)
+
+                        game.is_scorhegami = True
+                        stats.first_game_id = game.id
+                        stats.first_date = game.game_date
+
+                    if game.game_date > stats.last_date or (
+                        game.game_date == stats.last_date
+                        and key > await self._get_chronological_key(stats.last_game_id)
+                    ):
+                        classified_games.append((game, stats.count, stats.last_date))
+
+                        stats.last_game_id = game.id
+                        stats.last_date = game.game_date
+                    # Otherwise it is a backfilled game that happened before the most recent
+                    # game with its RHE, and is not tweeted: it is no news.
+
+                await classify_box_scores(games_in_final)
 
-                    game.is_scorhegami = rhe_cnt == 1
-                    await AppCtx.current.db.session.flush()
+                scorhegami_ordinals = await self._assign_scorhegami_ordinals(
+                    [game for game in games_in_final if game.is_scorhegami]
+                )
 
-                    await self._prepare_tweet(game, rhe_cnt)
+                tweet_contents = [
+                    (
+                        game.id,
+                        self._get_tweet_content(
+                            game,
+                            rhe_cnt,
+                            last_date,
+                            scorhegami_ordinals.get(game.id),
+                        ),
+                    )
+                    for game, rhe_cnt, last_date in classified_games
+                ]
 
+                # The session does not autoflush, and the stats are computed from the games in the database.
+                await AppCtx.current.db.session.flush()
+                await refresh_season_stats(
+                    {
+                        team_season
+                        for game in itertools.chain(games_in_final, displaced_games)
+                        for team_season in get_team_seasons(
+                            game.game_date, game.away_id, game.home_id
+                        )
+                    }
+                )
+
+                if tweet_contents:
+                    await AppCtx.current.db.session.execute(
+                        sa_exp.insert(m.Tweet),
+                        [
+                            {
+                                "game_id": game_id,
+                                "tweet_id": None,
+                                "content": content,
+                                "tweet_failed_reason": None,
+                                "status": TweetStatusEnum.pending,
+                            }
+                            for game_id, content in tweet_contents
+                        ],
+                    )
+
+                await notify(NotifyChannelEnum.game_classified)
                 await AppCtx.current.db.session.commit()
 
         except Exception:
             logger.exception(f"Failed to run {self.__class__.__name__}")
 
-    async def _prepare_tweet(self, game: m.Game, rhe_cnt: int) -> None:
-        content = await self._get_tweet_content(game, rhe_cnt)
+    async def _get_rhe_stats(self, games: Sequence[m.Game]) -> dict[int, m.RheStats]:
+        """
+        Returns the `rhe_stats` rows of the RHEs among `games`, keyed by the packed RHE.
+        They are locked until the end of the transaction, which also updates them.
+        """
 
-        await AppCtx.current.db.session.execute(
-            sa_exp.insert(m.Tweet).values(
-                game_id=game.id,
-                tweet_id=None,
-                content=content,
-                tweet_failed_reason=None,
-                status=TweetStatusEnum.pending,
+        rows = (
+            (
+                await AppCtx.current.db.session.execute(
+                    sa_exp.select(m.RheStats)
+                    .where(
+                        m.RheStats.rhe_key.in_({pack_rhe(game.rhe) for game in games})
+                    )
+                    .with_for_update()
+                )
             )
+            .scalars()
+            .all()
         )
 
-    async def _get_tweet_content(self, game: m.Game, rhe_cnt: int) -> str:
+        return {row.rhe_key: row for row in rows}
+
+    async def _get_chronological_key(self, game_id: int) -> tuple:
+        game = await AppCtx.current.db.session.get(m.Game, game_id)
+        assert game is not None
+        return get_chronological_key(game.game_date, game.start_time, game.id)
+
+    async def _assign_scorhegami_ordinals(
+        self, games: Sequence[m.Game]
+    ) -> dict[int, int]:
+        """
+        Gives the new ScoRHEgamis `games` their ordinals, and returns them keyed by game id.
+        They usually come after every known one and just take the next ordinals. When one
+        is older (e.g. a backfilled game), all ScoRHEgamis are renumbered instead.
+        """
+
+        if not games:
+            return {}
+
+        last_scorhegami = (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(*CHRONOLOGICAL_ORDER, m.Game.scorhegami_ordinal)
+                .where(m.Game.scorhegami_ordinal.isnot(None))
+                .order_by(m.Game.scorhegami_ordinal.desc())
+                .limit(1)
+            )
+        ).one_or_none()
+
+        last_key = None
+        last_ordinal = 0
+        if last_scorhegami is not None:
+            *last_key_values, last_ordinal = last_scorhegami
+            last_key = get_chronological_key(*last_key_values)
+
+        ordinals: dict[int, int] = {}
+        for game in sorted(
+            games,
+            key=lambda game: get_chronological_key(
+                game.game_date, game.start_time, game.id
+            ),
+        ):
+            key = get_chronological_key(game.game_date, game.start_time, game.id)
+            if last_key is not None and key < last_key:
+                break  # Renumber everything below.
+
+            last_key = key
+            last_ordinal += 1
+            ordinals[game.id] = game.scorhegami_ordinal = last_ordinal
+        else:
+            return ordinals
+
+        await AppCtx.current.db.session.flush()
+        renumbered_cnt = await renumber_scorhegami_ordinals()
+        logger.info("Renumbered %d ScoRHEgamis.", renumbered_cnt)
+
+        return dict(
+            (
+                await AppCtx.current.db.session.execute(
+                    sa_exp.select(m.Game.id, m.Game.scorhegami_ordinal).where(
+                        m.Game.id.in_([game.id for game in games])
+                    )
+                )
+            ).all()
+        )
+
+    def _get_tweet_content(
+        self,
+        game: m.Game,
+        rhe_cnt: int,
+        last_date: datetime.date | None,
+        scorhegami_ordinal: int | None,
+    ) -> str:
         def _add_spaces(short_name: str) -> str:
             if len(short_name) == 2:
                 return short_name + "  "
@@ -112,33 +321,24 @@ class ScorhegamiUpdaterTask(AsyncComponent):
                 return short_name
 
         rhe = game.rhe
+        away_team = AppCtx.current.team_registry.get(game.away_id)
+        home_team = AppCtx.current.team_registry.get(game.home_id)
 
         content = "FINAL\n"
         content += "          R  H  E\n"
-        content += f"{_add_spaces(game.away_team.short_name)}  {rhe[0]:2} {rhe[1]:2} {rhe[2]:2}\n"
-        content += f"{_add_spaces(game.home_team.short_name)}  {rhe[3]:2} {rhe[4]:2} {rhe[5]:2}\n"
+        content += (
+            f"{_add_spaces(away_team.short_name)}  {rhe[0]:2} {rhe[1]:2} {rhe[2]:2}\n"
+        )
+        content += (
+            f"{_add_spaces(home_team.short_name)}  {rhe[3]:2} {rhe[4]:2} {rhe[5]:2}\n"
+        )
 
         if game.is_scorhegami:
             content += "\nThat's ScoRHEgami!\n"
-            num_scorhegamis = (
-                await AppCtx.current.db.session.execute(
-                    sa_exp.select(sa_func.count())
-                    .select_from(m.Game)
-                    .where(m.Game.is_scorhegami.is_(True))
-                )
-            ).scalar_one()
-            content += f"It's the {self._get_ordinal_string(num_scorhegamis)} unique RHE score in history."
+            assert scorhegami_ordinal is not None
+            content += f"It's the {self._get_ordinal_string(scorhegami_ordinal)} unique RHE score in history."
         else:
-            last_date = (
-                await AppCtx.current.db.session.execute(
-                    sa_exp.select(m.Game.game_date)
-                    .where(m.Game.rhe == rhe)
-                    .order_by(m.Game.game_date.desc())
-                    .offset(1)
-                    .limit(1)
-                )
-            ).scalar_one()
-
+            assert last_date is not None
             content += f"\nNot a ScoRHEgami. That score has happened {rhe_cnt - 1} "
             content += "time" if rhe_cnt == 2 else "times"
             content += f" before, most recently on {last_date.strftime('%B %-d, %Y')}."
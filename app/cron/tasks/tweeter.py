@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import datetime
 import logging
 
@@ -8,7 +9,8 @@ from sqlalchemy.sql import expression as sa_exp
 
 from app.common.ctx import AppCtx, bind_app_ctx
 from app.common.models import orm as m
-from app.common.models.app import TweetStatusEnum
+from app.common.models.app import NotifyChannelEnum, TweetStatusEnum
+from app.common.utils.pg_notify import PgListener
 
 from .base import AsyncComponent
 
@@ -20,6 +22,13 @@ class TweeterTask(AsyncComponent):
         self.app_ctx = app_ctx
 
         self._tweeter_task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def subscribe(self, pg_listener: PgListener) -> None:
+        # Tweets are created along with the classification of the games.
+        pg_listener.subscribe(
+            NotifyChannelEnum.game_classified, lambda _: self._wakeup.set()
+        )
 
     async def start(self) -> None:
         self._tweeter_task = asyncio.create_task(self._run())
@@ -40,9 +49,11 @@ class TweeterTask(AsyncComponent):
 
     async def _run(self) -> None:
         while True:
+            self._wakeup.clear()
             await self._run_internal()
 
-            await asyncio.sleep(60)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=60)
 
     async def _run_internal(self) -> None:
         try:
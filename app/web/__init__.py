@@ -1,29 +1,108 @@
+import asyncio
+import contextlib
+import logging
 from contextlib import asynccontextmanager
 
 import sentry_sdk
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.common.ctx import bind_app_ctx, create_app_ctx
+from app.common.ctx import AppCtx, bind_app_ctx, create_app_ctx
+from app.common.models.app import NotifyChannelEnum
 from app.common.settings import AppSettings
+from app.common.utils.pg_notify import PgListener
 
 from .apis import API_ROUTERS
+from .middleware import AppCtxMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_cache_refresher(app_ctx: AppCtx, wakeup: asyncio.Event) -> None:
+    while True:
+        # Woken up early when the cron has classified games, so that they show up
+        # in the RHE distribution right away.
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(
+                wakeup.wait(), timeout=app_ctx.settings.RHE_INDEX_REFRESH_INTERVAL
+            )
+        wakeup.clear()
+
+        try:
+            async with bind_app_ctx(app_ctx):
+                await app_ctx.rhe_index.sync(
+                    reload_interval=app_ctx.settings.RHE_INDEX_RELOAD_INTERVAL
+                )
+        except Exception:
+            logger.exception("Failed to refresh RHE index")
+
+        # Game ETags hash the registry's version before the registry is used (and reloaded
+        # if stale) by a full response, so it is kept fresh here as well.
+        try:
+            async with bind_app_ctx(app_ctx):
+                await app_ctx.team_registry.ensure_loaded()
+        except Exception:
+            logger.exception("Failed to refresh team registry")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app_settings = AppSettings()
 
-    app.extra["_app_ctx"] = await create_app_ctx(app_settings)
+    app_ctx = await create_app_ctx(app_settings)
+    app.extra["_app_ctx"] = app_ctx
 
     sentry_sdk.init(
         dsn=app_settings.SENTRY_DSN,
         send_default_pii=True,
     )
 
+    # Both are loaded again later on (on first use for the team registry, by the
+    # refresher for the RHE index), so a failure here does not fail the startup.
+    try:
+        async with bind_app_ctx(app_ctx):
+            await app_ctx.team_registry.load()
+            await app_ctx.rhe_index.load()
+    except Exception:
+        logger.exception("Failed to preload in-memory caches")
+
+    pg_listener = PgListener(app_ctx.db.engine)
+    pg_listener.subscribe(
+        NotifyChannelEnum.game_status_changed,
+        lambda _: app_ctx.latest_completed_date.invalidate(),
+    )
+
+    rhe_index_wakeup = asyncio.Event()
+    pg_listener.subscribe(
+        NotifyChannelEnum.game_classified,
+        lambda _: rhe_index_wakeup.set(),
+    )
+
+    def on_game_deleted(payload: str) -> None:
+        # An empty payload is sent when the listener (re)connects, since deletions may
+        # have been missed.
+        app_ctx.rhe_index.discard_games(
+            [int(game_id) for game_id in payload.split(",")] if payload else None
+        )
+        rhe_index_wakeup.set()
+
+    pg_listener.subscribe(NotifyChannelEnum.game_deleted, on_game_deleted)
+
+    background_tasks = [
+        asyncio.create_task(_run_cache_refresher(app_ctx, rhe_index_wakeup)),
+        asyncio.create_task(pg_listener.run()),
+    ]
+
     yield
 
+    for task in background_tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    # Lets another worker take over writing the shared seen RHE set right away.
+    app_ctx.seen_rhes.close()
+
 
 def create_app() -> FastAPI:
     app = FastAPI(lifespan=lifespan)
@@ -31,13 +110,7 @@ def create_app() -> FastAPI:
     for api_router in API_ROUTERS:
         app.include_router(api_router)
 
-    async def app_ctx_middleware(request: Request, call_next):
-        app_ctx = request.app.extra["_app_ctx"]
-        async with bind_app_ctx(app_ctx):
-            response = await call_next(request)
-        return response
-
-    app.add_middleware(BaseHTTPMiddleware, dispatch=app_ctx_middleware)
+    app.add_middleware(AppCtxMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -1,7 +1,11 @@
 from .game import router as game_router
+from .rhe import router as rhe_router
+from .stats import router as stats_router
 from .team import router as team_router
 
 API_ROUTERS = [
     game_router,
+    rhe_router,
+    stats_router,
     team_router,
 ]
@@ -1,51 +1,102 @@
+import base64
 import datetime
+import itertools
+from collections.abc import Sequence
+from typing import Any
 
-from fastapi import Depends, HTTPException, Query, status
+import pydantic_core
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from fastapi.routing import APIRouter
 from pydantic import BaseModel, Field
 from sqlalchemy import func as sa_func
-from sqlalchemy import orm as sa_orm
+from sqlalchemy.engine import Row
 from sqlalchemy.sql import expression as sa_exp
 
 from app.common.ctx import AppCtx
 from app.common.models import orm as m
-from app.common.models.app import GameStatusEnum, TeamModel
+from app.common.models.app import GameStatusEnum, RheDimensionEnum, TeamModel
+from app.common.utils.box_score import (
+    BoxScoreInning,
+    get_box_score_key,
+    get_box_score_token,
+)
+from app.common.utils.rhe import pack_rhe, parse_rhe_range, unpack_rhe
+from app.common.utils.scorhegami import CHRONOLOGICAL_ORDER
+from app.web.http_cache import (
+    CACHE_CONTROL_FINAL,
+    CACHE_CONTROL_LIVE,
+    CacheValidators,
+    apply_cache_headers,
+    get_cache_validators,
+    get_game_cache_control,
+)
 
 router = APIRouter(prefix="/game", tags=["game"])
 
+_LIVE_STATUSES = {
+    GameStatusEnum.status_in_progress,
+    GameStatusEnum.status_rain_delay,
+}
+
 
 @router.get("/latest_completed_date")
-async def _() -> datetime.date:
+async def _(request: Request, response: Response) -> datetime.date:
     """
     Returns the most recent date when all games on that date have completed or were postponed.
     In other words, the most recent date with no games in STATUS_SCHEDULED or STATUS_IN_PROGRESS.
     """
 
-    dates_with_pending_games = (
-        (
-            await AppCtx.current.db.session.execute(
-                sa_exp.select(m.Game.game_date)
-                .where(
-                    (m.Game.status == GameStatusEnum.status_scheduled)
-                    | (m.Game.status == GameStatusEnum.status_in_progress)
-                )
-                .distinct()
-            )
-        )
-        .scalars()
-        .all()
-    )
+    apply_cache_headers(request, response, CACHE_CONTROL_LIVE)
 
-    most_recent_completed_date = (
-        await AppCtx.current.db.session.execute(
-            sa_exp.select(m.Game.game_date)
-            .where(m.Game.game_date.notin_(dates_with_pending_games))
-            .order_by(m.Game.game_date.desc())
-            .limit(1)
-        )
-    ).scalar_one()
+    return await AppCtx.current.latest_completed_date.get()
+
+
+_RHE_RANGE_PATTERN = r"^\d+(-\d*)?$"
+
+
+class GameRheRangeRequest(BaseModel):
+    # `N`, `N-M` or `N-` (N or more). Components that are not given match any value.
+    away_r: str | None = Field(None, pattern=_RHE_RANGE_PATTERN)
+    away_h: str | None = Field(None, pattern=_RHE_RANGE_PATTERN)
+    away_e: str | None = Field(None, pattern=_RHE_RANGE_PATTERN)
+    home_r: str | None = Field(None, pattern=_RHE_RANGE_PATTERN)
+    home_h: str | None = Field(None, pattern=_RHE_RANGE_PATTERN)
+    home_e: str | None = Field(None, pattern=_RHE_RANGE_PATTERN)
+
+
+_RHE_COMPONENT_COLUMNS = {
+    RheDimensionEnum.away_r: m.Game.rhe_away_r,
+    RheDimensionEnum.away_h: m.Game.rhe_away_h,
+    RheDimensionEnum.away_e: m.Game.rhe_away_e,
+    RheDimensionEnum.home_r: m.Game.rhe_home_r,
+    RheDimensionEnum.home_h: m.Game.rhe_home_h,
+    RheDimensionEnum.home_e: m.Game.rhe_home_e,
+}
+
+
+def _rhe_range_conditions(
+    rhe_range: GameRheRangeRequest,
+) -> list[sa_exp.ColumnElement[bool]]:
+    conditions: list[sa_exp.ColumnElement[bool]] = []
 
-    return most_recent_completed_date
+    for dim, column in _RHE_COMPONENT_COLUMNS.items():
+        value = getattr(rhe_range, dim.value)
+        if value is None:
+            continue
+
+        try:
+            lower, upper = parse_rhe_range(value)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if lower == upper:
+            conditions.append(column == lower)
+        else:
+            conditions.append(column >= lower)
+            if upper is not None:
+                conditions.append(column <= upper)
+
+    return conditions
 
 
 class GameCountRequest(BaseModel):
@@ -54,18 +105,54 @@ class GameCountRequest(BaseModel):
 
 @router.get("/count")
 async def _(
+    request: Request,
+    response: Response,
     q: GameCountRequest = Depends(),
+    rhe_range: GameRheRangeRequest = Depends(),
     rhe: list[int] | None = Query(None),
     filter_dates: list[datetime.date] | None = Query(None),
     filter_statuses: list[GameStatusEnum] | None = Query(None),
 ) -> int:
+    """
+    Returns the number of games `GET /game` would list with the same filters.
+    This is also the count endpoint of the RHE component searches; there is no separate one.
+    """
+
     if rhe is not None and len(rhe) != 6:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
+    rhe_range_conditions = _rhe_range_conditions(rhe_range)
+
+    apply_cache_headers(request, response, CACHE_CONTROL_LIVE)
+
+    rhe_index = AppCtx.current.rhe_index
+    if (
+        rhe is not None
+        and rhe_index.is_loaded
+        and not rhe_range_conditions
+        and filter_dates is None
+        and filter_statuses is None
+    ):
+        entry = rhe_index.get(rhe)
+        if entry is None:
+            return 0
+
+        scorhegami_cnt = int(entry.scorhegami_game_id is not None)
+        match q.is_scorhegami:
+            case None:
+                return entry.count
+            case True:
+                return scorhegami_cnt
+            case False:
+                return entry.final_count - scorhegami_cnt
+
     count_query = sa_exp.select(sa_func.count()).select_from(m.Game)
 
     if rhe is not None:
-        count_query = count_query.where(m.Game.rhe == rhe)
+        count_query = count_query.where(_rhe_condition(rhe))
+
+    if rhe_range_conditions:
+        count_query = count_query.where(*rhe_range_conditions)
 
     if q.is_scorhegami is not None:
         count_query = count_query.where(m.Game.is_scorhegami.is_(q.is_scorhegami))
@@ -98,87 +185,759 @@ class GameGetResponse(BaseModel):
     box_score: list[int] | None
     rhe: list[int] | None
     is_scorhegami: bool | None
+    scorhegami_ordinal: int | None
+    is_unique_box_score: bool | None
+    # Only set for games in progress: whether no finished game has had their current RHE.
+    is_rhe_unseen: bool | None = None
     bref_url: str | None
     date: datetime.date
 
 
+# Columns needed to build a `GameGetResponse`, selected as plain rows instead of
+# ORM objects. `_to_game_dicts` unpacks them in this order.
+_GAME_COLUMNS = (
+    m.Game.id,
+    m.Game.balldontlie_id,
+    m.Game.away_id,
+    m.Game.home_id,
+    m.Game.start_time,
+    m.Game.end_time,
+    m.Game.status,
+    m.Game.box_score,
+    m.Game.rhe,
+    m.Game.is_scorhegami,
+    m.Game.scorhegami_ordinal,
+    m.Game.is_unique_box_score,
+    m.Game.bref_url,
+    m.Game.game_date,
+    m.Game.updated_at,
+)
+
+
+def _rhe_condition(rhe: list[int]) -> sa_exp.ColumnElement[bool]:
+    try:
+        return m.Game.rhe_key == pack_rhe(rhe)
+    except ValueError:
+        # No game has an RHE that can not be packed.
+        return sa_exp.false()
+
+
+def _filter_games_query(
+    games_query: sa_exp.Select,
+    *,
+    rhe: list[int] | None,
+    rhe_range_conditions: list[sa_exp.ColumnElement[bool]],
+    filter_dates: list[datetime.date] | None,
+    filter_statuses: list[GameStatusEnum] | None,
+    is_scorhegami: bool | None,
+) -> sa_exp.Select:
+    if rhe is not None:
+        games_query = games_query.where(_rhe_condition(rhe))
+
+    if rhe_range_conditions:
+        games_query = games_query.where(*rhe_range_conditions)
+
+    if filter_dates is not None:
+        games_query = games_query.where(m.Game.game_date.in_(filter_dates))
+
+    if filter_statuses is not None:
+        games_query = games_query.where(m.Game.status.in_(filter_statuses))
+
+    if is_scorhegami is not None:
+        games_query = games_query.where(m.Game.is_scorhegami.is_(is_scorhegami))
+
+    return games_query
+
+
+async def _get_game_list_cache_control(
+    games: Sequence[Row], filter_dates: list[datetime.date] | None
+) -> str:
+    # New games can show up in a list at any time, unless it is restricted to dates
+    # whose games have all finished already.
+    if filter_dates is None or not games:
+        return CACHE_CONTROL_LIVE
+
+    if (
+        get_game_cache_control((game.status, game.is_scorhegami) for game in games)
+        != CACHE_CONTROL_FINAL
+    ):
+        return CACHE_CONTROL_LIVE
+
+    latest_completed_date = await AppCtx.current.latest_completed_date.get()
+    if any(date > latest_completed_date for date in filter_dates):
+        return CACHE_CONTROL_LIVE
+
+    return CACHE_CONTROL_FINAL
+
+
+def _is_rhe_unseen(game_status: str | None, rhe: list[int] | None) -> bool | None:
+    rhe_index = AppCtx.current.rhe_index
+    if game_status not in _LIVE_STATUSES or rhe is None or not rhe_index.is_loaded:
+        return None
+
+    return not rhe_index.is_seen(rhe)
+
+
+def _get_game_cache_validators(
+    games: Sequence[Row], *extra: object, single_resource: bool = False
+) -> CacheValidators:
+    # is_rhe_unseen changes when other games finish, without touching the game's row,
+    # so a game that carries it is revalidated through the ETag alone.
+    is_rhe_unseen = [_is_rhe_unseen(game.status, game.rhe) for game in games]
+    return get_cache_validators(
+        ((game.id, game.updated_at) for game in games),
+        AppCtx.current.team_registry.version,
+        is_rhe_unseen,
+        *extra,
+        single_resource=single_resource and all(flag is None for flag in is_rhe_unseen),
+    )
+
+
+async def _to_game_dicts(games: Sequence[Row]) -> list[dict[str, Any]]:
+    """
+    Builds the `GameGetResponse` payloads as plain dicts, skipping the model
+    validation. Pair it with `_json_response` to encode the result in one pass.
+    """
+
+    team_registry = AppCtx.current.team_registry
+    await team_registry.ensure_loaded(
+        team_ids=itertools.chain.from_iterable(
+            (game.away_id, game.home_id) for game in games
+        )
+    )
+
+    return [
+        {
+            "id": game_id,
+            "balldontlie_id": balldontlie_id,
+            "away_team": team_registry.get(away_id),
+            "home_team": team_registry.get(home_id),
+            "start_time": start_time,
+            "end_time": end_time,
+            "status": game_status,
+            "box_score": box_score,
+            "rhe": rhe,
+            "is_scorhegami": is_scorhegami,
+            "scorhegami_ordinal": scorhegami_ordinal,
+            "is_unique_box_score": is_unique_box_score,
+            "is_rhe_unseen": _is_rhe_unseen(game_status, rhe),
+            "bref_url": bref_url,
+            "date": game_date,
+        }
+        for (
+            game_id,
+            balldontlie_id,
+            away_id,
+            home_id,
+            start_time,
+            end_time,
+            game_status,
+            box_score,
+            rhe,
+            is_scorhegami,
+            scorhegami_ordinal,
+            is_unique_box_score,
+            bref_url,
+            game_date,
+            _,
+        ) in games
+    ]
+
+
+def _json_response(content: Any, response: Response) -> Response:
+    return Response(
+        content=pydantic_core.to_json(content),
+        media_type="application/json",
+        headers=response.headers,
+    )
+
+
 @router.get("")
 async def _(
+    request: Request,
+    response: Response,
     q: GameGetRequest = Depends(),
+    rhe_range: GameRheRangeRequest = Depends(),
     rhe: list[int] | None = Query(None),
     filter_dates: list[datetime.date] | None = Query(None),
     filter_statuses: list[GameStatusEnum] | None = Query(None),
 ) -> list[GameGetResponse]:
+    """
+    Returns the games matching every given filter, most recent first.
+
+    `rhe` is an exact RHE (all six values). The RHE components can also be filtered one by one
+    with `N`, `N-M` or `N-` (N or more), e.g. `away_r=3&home_r=2` for every 3-2 game,
+    `home_h=0` for the games where the home team had no hits. `GET /game/count` counts the matches.
+    """
+
     if rhe is not None and len(rhe) != 6:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
-    games_query = sa_exp.select(m.Game).options(
-        sa_orm.joinedload(m.Game.away_team),
-        sa_orm.joinedload(m.Game.home_team),
+    rhe_range_conditions = _rhe_range_conditions(rhe_range)
+
+    rhe_index = AppCtx.current.rhe_index
+    if rhe is not None and rhe_index.is_loaded and rhe_index.get(rhe) is None:
+        apply_cache_headers(request, response, CACHE_CONTROL_LIVE)
+        return []
+
+    games_query = _filter_games_query(
+        sa_exp.select(*_GAME_COLUMNS),
+        rhe=rhe,
+        rhe_range_conditions=rhe_range_conditions,
+        filter_dates=filter_dates,
+        filter_statuses=filter_statuses,
+        is_scorhegami=q.is_scorhegami,
     )
 
-    if rhe is not None:
-        games_query = games_query.where(m.Game.rhe == rhe)
+    games = (
+        await AppCtx.current.db.session.execute(
+            games_query.order_by(m.Game.start_time.desc())
+            .offset(q.offset)
+            .limit(q.count)
+        )
+    ).all()
 
-    if filter_dates is not None:
-        games_query = games_query.where(m.Game.game_date.in_(filter_dates))
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        await _get_game_list_cache_control(games, filter_dates),
+        _get_game_cache_validators(games),
+    )
+    if not_modified is not None:
+        return not_modified
 
-    if filter_statuses is not None:
-        games_query = games_query.where(m.Game.status.in_(filter_statuses))
+    return _json_response(await _to_game_dicts(games), response)
 
-    if q.is_scorhegami is not None:
-        games_query = games_query.where(m.Game.is_scorhegami.is_(q.is_scorhegami))
 
+class GamePaginatedGetRequest(BaseModel):
+    count: int = Field(ge=1, le=50)
+    cursor: str | None = None
+    is_scorhegami: bool | None = None
+
+
+class GamePaginationMeta(BaseModel):
+    per_page: int
+    next_cursor: str | None = None
+
+
+class GamePaginatedGetResponse(BaseModel):
+    data: list[GameGetResponse]
+    meta: GamePaginationMeta
+
+
+def _encode_game_cursor(game: Row) -> str:
+    assert game.start_time is not None
+    raw = f"{game.start_time.isoformat()}|{game.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_game_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    try:
+        start_time, game_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return datetime.datetime.fromisoformat(start_time), int(game_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+@router.get("/paginated")
+async def _(
+    request: Request,
+    response: Response,
+    q: GamePaginatedGetRequest = Depends(),
+    rhe_range: GameRheRangeRequest = Depends(),
+    rhe: list[int] | None = Query(None),
+    filter_dates: list[datetime.date] | None = Query(None),
+    filter_statuses: list[GameStatusEnum] | None = Query(None),
+) -> GamePaginatedGetResponse:
+    """
+    Same as `GET /game`, but paginated with an opaque cursor on (start_time, id) instead of an offset,
+    so every page costs the same as the first one. Games without a start time are not listed.
+
+    That holds without filters, with a single `filter_statuses` value and with `is_scorhegami`.
+    With several `filter_statuses` values, a page skips over the games of the other statuses,
+    so deep pages get slower when the requested statuses are rare.
+    """
+
+    if rhe is not None and len(rhe) != 6:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    rhe_range_conditions = _rhe_range_conditions(rhe_range)
+
+    meta = GamePaginationMeta(per_page=q.count)
+
+    rhe_index = AppCtx.current.rhe_index
+    if rhe is not None and rhe_index.is_loaded and rhe_index.get(rhe) is None:
+        apply_cache_headers(request, response, CACHE_CONTROL_LIVE)
+        return GamePaginatedGetResponse(data=[], meta=meta)
+
+    games_query = _filter_games_query(
+        sa_exp.select(*_GAME_COLUMNS).where(m.Game.start_time.isnot(None)),
+        rhe=rhe,
+        rhe_range_conditions=rhe_range_conditions,
+        filter_dates=filter_dates,
+        filter_statuses=filter_statuses,
+        is_scorhegami=q.is_scorhegami,
+    )
+
+    if q.cursor is not None:
+        games_query = games_query.where(
+            sa_exp.tuple_(m.Game.start_time, m.Game.id)
+            < sa_exp.tuple_(*_decode_game_cursor(q.cursor))
+        )
+
+    # Fetch one extra game to know whether there is a next page.
     games = (
-        (
+        await AppCtx.current.db.session.execute(
+            games_query.order_by(m.Game.start_time.desc(), m.Game.id.desc()).limit(
+                q.count + 1
+            )
+        )
+    ).all()
+
+    if len(games) > q.count:
+        games = games[: q.count]
+        meta.next_cursor = _encode_game_cursor(games[-1])
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        await _get_game_list_cache_control(games, filter_dates),
+        _get_game_cache_validators(games, meta.next_cursor),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return _json_response(
+        {"data": await _to_game_dicts(games), "meta": meta},
+        response,
+    )
+
+
+class GameBatchGetResponse(BaseModel):
+    data: list[GameGetResponse]
+    not_found: list[int]
+
+
+@router.get("/batch")
+async def _(
+    request: Request,
+    response: Response,
+    ids: list[int] = Query(min_length=1, max_length=300),
+) -> GameBatchGetResponse:
+    """
+    Returns the games with the given ids in a single query.
+    `data` follows the order of `ids` with duplicates removed, and ids without a game are listed in `not_found`.
+    """
+
+    game_ids = list(dict.fromkeys(ids))
+
+    games_by_id = {
+        game.id: game
+        for game in (
             await AppCtx.current.db.session.execute(
-                games_query.order_by(m.Game.start_time.desc())
-                .offset(q.offset)
-                .limit(q.count)
+                sa_exp.select(*_GAME_COLUMNS).where(m.Game.id.in_(game_ids))
             )
+        ).all()
+    }
+
+    games = [games_by_id[game_id] for game_id in game_ids if game_id in games_by_id]
+    not_found = [game_id for game_id in game_ids if game_id not in games_by_id]
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        # A missing id may still be taken by a game inserted later on.
+        CACHE_CONTROL_LIVE
+        if not_found
+        else get_game_cache_control(
+            (game.status, game.is_scorhegami) for game in games
+        ),
+        _get_game_cache_validators(games, not_found),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return _json_response(
+        {"data": await _to_game_dicts(games), "not_found": not_found},
+        response,
+    )
+
+
+def _box_score_condition(box_score: list[int]) -> sa_exp.ColumnElement[bool]:
+    # Live games have a box score key as well, so only classified games are matched. The key
+    # narrows the search down through its index, and comparing the arrays rules out hash collisions.
+    return sa_exp.and_(
+        m.Game.box_score_key == get_box_score_key(box_score),
+        m.Game.box_score == box_score,
+        m.Game.is_scorhegami.isnot(None),
+    )
+
+
+@router.get("/box_score/count")
+async def _(
+    request: Request,
+    response: Response,
+    box_score: list[int] = Query(min_length=1),
+) -> int:
+    """
+    Returns the number of finished games with exactly this inning-by-inning box score.
+    """
+
+    apply_cache_headers(request, response, CACHE_CONTROL_LIVE)
+
+    return (
+        await AppCtx.current.db.session.execute(
+            sa_exp.select(sa_func.count())
+            .select_from(m.Game)
+            .where(_box_score_condition(box_score))
+        )
+    ).scalar_one()
+
+
+class GameBoxScoreGetRequest(BaseModel):
+    offset: int = Field(0, ge=0)
+    count: int = Field(ge=1, le=50)
+
+
+@router.get("/box_score")
+async def _(
+    request: Request,
+    response: Response,
+    q: GameBoxScoreGetRequest = Depends(),
+    box_score: list[int] = Query(min_length=1),
+) -> list[GameGetResponse]:
+    """
+    Returns the finished games with exactly this inning-by-inning box score, oldest first.
+    """
+
+    games = (
+        await AppCtx.current.db.session.execute(
+            sa_exp.select(*_GAME_COLUMNS)
+            .where(_box_score_condition(box_score))
+            .order_by(*CHRONOLOGICAL_ORDER)
+            .offset(q.offset)
+            .limit(q.count)
         )
-        .scalars()
-        .all()
+    ).all()
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        _get_game_cache_validators(games),
     )
+    if not_modified is not None:
+        return not_modified
 
-    return [
-        GameGetResponse(
-            id=game.id,
-            balldontlie_id=game.balldontlie_id,
-            away_team=TeamModel(
-                id=game.away_team.id,
-                short_name=game.away_team.short_name,
-                name=game.away_team.name,
-            ),
-            home_team=TeamModel(
-                id=game.home_team.id,
-                short_name=game.home_team.short_name,
-                name=game.home_team.name,
-            ),
-            start_time=game.start_time,
-            end_time=game.end_time,
-            status=game.status,
-            box_score=game.box_score,
-            rhe=game.rhe,
-            is_scorhegami=game.is_scorhegami,
-            bref_url=game.bref_url,
-            date=game.game_date,
-        )
-        for game in games
+    return _json_response(await _to_game_dicts(games), response)
+
+
+def _parse_box_score_constraint(constraint: str) -> list[int]:
+    """
+    Parses a `<team>:<inning>:<runs>` constraint into the box score tokens satisfying it, any one of which is enough.
+    `team` is away, home or either. `inning` is an inning number, `any` for some inning or `all` for every inning.
+    """
+
+    try:
+        team, inning, runs = constraint.split(":")
+        if inning in BoxScoreInning.__members__:
+            inning_code = BoxScoreInning[inning].value
+        elif BoxScoreInning.any < int(inning) < BoxScoreInning.all:
+            inning_code = int(inning)
+        else:
+            raise ValueError(inning)
+        runs_cnt = int(runs)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid box score constraint: {constraint}",
+        )
+
+    sides = {"away": [False], "home": [True], "either": [False, True]}.get(team)
+    if sides is None or not 0 <= runs_cnt <= 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid box score constraint: {constraint}",
+        )
+
+    return [get_box_score_token(is_home, inning_code, runs_cnt) for is_home in sides]
+
+
+class GameBoxScoreSearchGetRequest(BaseModel):
+    count: int = Field(ge=1, le=50)
+    cursor: str | None = None
+
+
+def _encode_chronological_cursor(game: Row) -> str:
+    start_time = game.start_time.isoformat() if game.start_time is not None else ""
+    raw = f"{game.game_date.isoformat()}|{start_time}|{game.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_chronological_cursor(
+    cursor: str,
+) -> tuple[datetime.date, datetime.datetime | None, int]:
+    try:
+        game_date, start_time, game_id = (
+            base64.urlsafe_b64decode(cursor).decode().split("|")
+        )
+        return (
+            datetime.date.fromisoformat(game_date),
+            datetime.datetime.fromisoformat(start_time) if start_time else None,
+            int(game_id),
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def _after_chronological_cursor(cursor: str) -> sa_exp.ColumnElement[bool]:
+    """
+    Games after the cursor in `CHRONOLOGICAL_ORDER`, where games without a start time come last
+    on their date. A row comparison can't express that, so the date bound is spelled out
+    on its own for the index to seek to.
+    """
+
+    game_date, start_time, game_id = _decode_chronological_cursor(cursor)
+
+    if start_time is None:
+        same_date_after = sa_exp.and_(m.Game.start_time.is_(None), m.Game.id > game_id)
+    else:
+        same_date_after = sa_exp.or_(
+            m.Game.start_time.is_(None),
+            sa_exp.tuple_(m.Game.start_time, m.Game.id)
+            > sa_exp.tuple_(start_time, game_id),
+        )
+
+    return sa_exp.and_(
+        m.Game.game_date >= game_date,
+        sa_exp.or_(
+            m.Game.game_date > game_date,
+            same_date_after,
+        ),
+    )
+
+
+@router.get("/box_score/search")
+async def _(
+    request: Request,
+    response: Response,
+    q: GameBoxScoreSearchGetRequest = Depends(),
+    constraint: list[str] = Query(min_length=1, max_length=10),
+) -> GamePaginatedGetResponse:
+    """
+    Returns the finished games whose box score satisfies every `<team>:<inning>:<runs>` constraint, oldest first.
+    Paginated with an opaque cursor on the chronological order, so that deep pages cost the same as the first.
+
+    e.g. `away:all:0` for games where the away team scored 0 in every inning,
+    `home:any:10` for games where the home team scored exactly 10 in some inning,
+    `either:1:3` for games where a team scored 3 in the first inning.
+    """
+
+    # Single-team constraints are all checked by one containment, and each `either`
+    # one by an overlap, so the GIN index answers all of them. For broad constraints,
+    # the planner can instead walk ix_game_classified_chronological in order and stop
+    # at the page size, rather than sorting every match.
+    required_tokens: list[int] = []
+    games_query = sa_exp.select(*_GAME_COLUMNS).where(m.Game.is_scorhegami.isnot(None))
+
+    for tokens in map(_parse_box_score_constraint, constraint):
+        if len(tokens) == 1:
+            required_tokens.extend(tokens)
+        else:
+            games_query = games_query.where(m.Game.box_score_tokens.overlap(tokens))
+
+    if required_tokens:
+        games_query = games_query.where(
+            m.Game.box_score_tokens.contains(required_tokens)
+        )
+
+    if q.cursor is not None:
+        games_query = games_query.where(_after_chronological_cursor(q.cursor))
+
+    # Fetch one extra game to know whether there is a next page.
+    games = (
+        await AppCtx.current.db.session.execute(
+            games_query.order_by(*CHRONOLOGICAL_ORDER).limit(q.count + 1)
+        )
+    ).all()
+
+    meta = GamePaginationMeta(per_page=q.count)
+    if len(games) > q.count:
+        games = games[: q.count]
+        meta.next_cursor = _encode_chronological_cursor(games[-1])
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        _get_game_cache_validators(games, meta.next_cursor),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return _json_response(
+        {"data": await _to_game_dicts(games), "meta": meta},
+        response,
+    )
+
+
+class GameScorhegamiWatchGetRequest(BaseModel):
+    max_increase: int = Field(2, ge=0, le=4)
+
+
+class UnseenFinalRheModel(BaseModel):
+    rhe: list[int]
+    # Runs, hits and errors still to add to the current RHE.
+    increase: int
+
+
+class GameScorhegamiWatchGetResponse(BaseModel):
+    game: GameGetResponse
+    is_rhe_unseen: bool
+    unseen_final_rhes: list[UnseenFinalRheModel]
+
+
+@router.get("/live/scorhegami_watch")
+async def _(
+    request: Request,
+    response: Response,
+    q: GameScorhegamiWatchGetRequest = Depends(),
+) -> list[GameScorhegamiWatchGetResponse]:
+    """
+    For every game in progress, tells whether its current RHE has ever occurred, and which final RHEs
+    adding up to `max_increase` runs, hits and errors to it would be new ScoRHEgamis.
+    """
+
+    rhe_index = AppCtx.current.rhe_index
+    if not rhe_index.is_loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="RHE index is not loaded yet",
+        )
+
+    games = (
+        await AppCtx.current.db.session.execute(
+            sa_exp.select(*_GAME_COLUMNS)
+            .where(
+                m.Game.status.in_(_LIVE_STATUSES),
+                m.Game.rhe_key.isnot(None),
+            )
+            .order_by(m.Game.start_time.asc(), m.Game.id.asc())
+        )
+    ).all()
+
+    watches = [
+        {
+            "game": game_dict,
+            "is_rhe_unseen": game_dict["is_rhe_unseen"],
+            "unseen_final_rhes": [
+                {"rhe": unpack_rhe(key), "increase": increase}
+                for key, increase in rhe_index.find_unseen_finals(
+                    game.rhe, max_increase=q.max_increase
+                )
+            ],
+        }
+        for game, game_dict in zip(games, await _to_game_dicts(games))
     ]
 
+    # The unseen final RHEs also change when other games finish, so they are part of the ETag.
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        _get_game_cache_validators(
+            games,
+            [watch["unseen_final_rhes"] for watch in watches],
+        ),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return _json_response(watches, response)
+
+
+class GameScorhegamiGetRequest(BaseModel):
+    start: int = Field(ge=1)
+    count: int = Field(ge=1, le=50)
+
+
+@router.get("/scorhegami")
+async def _(
+    request: Request,
+    response: Response,
+    q: GameScorhegamiGetRequest = Depends(),
+) -> list[GameGetResponse]:
+    """
+    Returns the ScoRHEgamis with ordinals from `start` to `start + count - 1`, in chronological order.
+    """
+
+    games = (
+        await AppCtx.current.db.session.execute(
+            sa_exp.select(*_GAME_COLUMNS)
+            .where(
+                m.Game.scorhegami_ordinal >= q.start,
+                m.Game.scorhegami_ordinal < q.start + q.count,
+            )
+            .order_by(m.Game.scorhegami_ordinal.asc())
+        )
+    ).all()
+
+    # Ordinals shift when an older game is found to be a ScoRHEgami.
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        _get_game_cache_validators(games),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return _json_response(await _to_game_dicts(games), response)
+
+
+@router.get("/scorhegami/{ordinal}")
+async def _(request: Request, response: Response, ordinal: int) -> GameGetResponse:
+    """
+    Returns the `ordinal`-th ScoRHEgami in history, starting from 1.
+    """
+
+    game = (
+        await AppCtx.current.db.session.execute(
+            sa_exp.select(*_GAME_COLUMNS).where(m.Game.scorhegami_ordinal == ordinal)
+        )
+    ).first()
+
+    if game is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ScoRHEgami #{ordinal} not found",
+        )
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        _get_game_cache_validators([game], single_resource=True),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return _json_response((await _to_game_dicts([game]))[0], response)
+
 
 @router.get("/{game_id}")
-async def _(game_id: int) -> GameGetResponse:
+async def _(request: Request, response: Response, game_id: int) -> GameGetResponse:
     game = (
         await AppCtx.current.db.session.execute(
-            sa_exp.select(m.Game)
-            .options(
-                sa_orm.joinedload(m.Game.away_team), sa_orm.joinedload(m.Game.home_team)
-            )
-            .where(m.Game.id == game_id)
+            sa_exp.select(*_GAME_COLUMNS).where(m.Game.id == game_id)
         )
-    ).scalar_one_or_none()
+    ).one_or_none()
 
     if game is None:
         raise HTTPException(
@@ -186,25 +945,13 @@ async def _(game_id: int) -> GameGetResponse:
             detail=f"Game with id {game_id} not found",
         )
 
-    return GameGetResponse(
-        id=game.id,
-        balldontlie_id=game.balldontlie_id,
-        away_team=TeamModel(
-            id=game.away_team.id,
-            short_name=game.away_team.short_name,
-            name=game.away_team.name,
-        ),
-        home_team=TeamModel(
-            id=game.home_team.id,
-            short_name=game.home_team.short_name,
-            name=game.home_team.name,
-        ),
-        start_time=game.start_time,
-        end_time=game.end_time,
-        status=game.status,
-        box_score=game.box_score,
-        rhe=game.rhe,
-        is_scorhegami=game.is_scorhegami,
-        bref_url=game.bref_url,
-        date=game.game_date,
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        get_game_cache_control([(game.status, game.is_scorhegami)]),
+        _get_game_cache_validators([game], single_resource=True),
     )
+    if not_modified is not None:
+        return not_modified
+
+    return _json_response((await _to_game_dicts([game]))[0], response)
@@ -0,0 +1,232 @@
+import datetime
+
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from fastapi.routing import APIRouter
+from pydantic import BaseModel, Field
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.caches.rhe_distribution import DIMENSION_SIZES
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.models.app import RheDimensionEnum
+from app.common.utils.rhe import RHE_LENGTH, pack_rhe, unpack_rhe
+from app.web.http_cache import (
+    CACHE_CONTROL_LIVE,
+    apply_cache_headers,
+    get_cache_validators,
+)
+
+router = APIRouter(prefix="/rhe", tags=["rhe"])
+
+
+class RheDistributionGetRequest(BaseModel):
+    x: RheDimensionEnum
+    y: RheDimensionEnum
+    away_r: int | None = Field(None, ge=0)
+    away_h: int | None = Field(None, ge=0)
+    away_e: int | None = Field(None, ge=0)
+    home_r: int | None = Field(None, ge=0)
+    home_h: int | None = Field(None, ge=0)
+    home_e: int | None = Field(None, ge=0)
+
+
+class RheDistributionGetResponse(BaseModel):
+    x: RheDimensionEnum
+    y: RheDimensionEnum
+    # Largest value of each axis. The last row and column also count every larger value.
+    x_max: int
+    y_max: int
+    counts: list[list[int]]
+    first_dates: list[list[datetime.date | None]]
+
+
+@router.get("/distribution")
+async def _(
+    request: Request,
+    response: Response,
+    q: RheDistributionGetRequest = Depends(),
+) -> RheDistributionGetResponse:
+    """
+    Returns how many finished games had each (x, y) value pair, and the date each pair was first seen.
+    The other RHE components can be fixed with their query parameters, and are summed over otherwise.
+
+    e.g. `x=away_r&y=home_r` for the final scores,
+    `x=home_h&y=home_e&away_r=3&home_r=5` for the home team's hits and errors in 3-5 games.
+    """
+
+    fixed = {
+        dim: value
+        for dim in RheDimensionEnum
+        if (value := getattr(q, dim.value)) is not None
+    }
+    if q.x == q.y or q.x in fixed or q.y in fixed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="x, y and the fixed components must all be different",
+        )
+
+    rhe_distribution = AppCtx.current.rhe_distribution
+    if not rhe_distribution.is_loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="RHE distribution is not loaded yet",
+        )
+
+    rhe_slice = rhe_distribution.get_slice(q.x, q.y, fixed)
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        get_cache_validators((), rhe_slice.counts, rhe_slice.first_dates),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return RheDistributionGetResponse(
+        x=q.x,
+        y=q.y,
+        x_max=DIMENSION_SIZES[q.x] - 1,
+        y_max=DIMENSION_SIZES[q.y] - 1,
+        counts=rhe_slice.counts,
+        first_dates=rhe_slice.first_dates,
+    )
+
+
+class RheStatsGetResponse(BaseModel):
+    rhe: list[int]
+    count: int
+    first_game_id: int
+    first_date: datetime.date
+    last_game_id: int
+    last_date: datetime.date
+
+
+@router.get("/stats")
+async def _(
+    request: Request,
+    response: Response,
+    rhe: list[int] = Query(),
+) -> RheStatsGetResponse:
+    """
+    Returns how many finished games had the RHE, and their first (the ScoRHEgami) and most recent ones.
+    """
+
+    if len(rhe) != RHE_LENGTH:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        rhe_key = pack_rhe(rhe)
+    except ValueError:
+        rhe_key = None
+
+    rhe_stats = None
+    if rhe_key is not None:
+        rhe_stats = (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(m.RheStats).where(m.RheStats.rhe_key == rhe_key)
+            )
+        ).scalar_one_or_none()
+
+    if rhe_stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No finished game with RHE {rhe}",
+        )
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        get_cache_validators(
+            [(rhe_stats.rhe_key, rhe_stats.updated_at)], single_resource=True
+        ),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return RheStatsGetResponse(
+        rhe=rhe,
+        count=rhe_stats.count,
+        first_game_id=rhe_stats.first_game_id,
+        first_date=rhe_stats.first_date,
+        last_game_id=rhe_stats.last_game_id,
+        last_date=rhe_stats.last_date,
+    )
+
+
+class RheNearestGetRequest(BaseModel):
+    count: int = Field(10, ge=1, le=50)
+    max_distance: int = Field(4, ge=0, le=5)
+
+
+class RheNeighborModel(BaseModel):
+    rhe: list[int]
+    distance: int
+    count: int
+    first_date: datetime.date | None
+
+
+class RheNearestGetResponse(BaseModel):
+    seen: list[RheNeighborModel]
+    unseen: list[RheNeighborModel]
+
+
+@router.get("/nearest")
+async def _(
+    request: Request,
+    response: Response,
+    q: RheNearestGetRequest = Depends(),
+    rhe: list[int] = Query(),
+) -> RheNearestGetResponse:
+    """
+    Returns the RHEs nearest to `rhe` that finished games have had (`seen`) and have not had yet (`unseen`),
+    by L1 distance: the sum of the absolute differences of the six values.
+    """
+
+    if len(rhe) != RHE_LENGTH or not all(0 <= value <= 255 for value in rhe):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    rhe_index = AppCtx.current.rhe_index
+    if not rhe_index.is_loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="RHE index is not loaded yet",
+        )
+
+    seen, unseen = rhe_index.find_nearest(
+        rhe, count=q.count, max_distance=q.max_distance
+    )
+
+    nearest = RheNearestGetResponse(
+        seen=[
+            RheNeighborModel(
+                rhe=unpack_rhe(neighbor.key),
+                distance=neighbor.distance,
+                count=neighbor.entry.final_count,
+                first_date=neighbor.entry.first_date,
+            )
+            for neighbor in seen
+            if neighbor.entry is not None
+        ],
+        unseen=[
+            RheNeighborModel(
+                rhe=unpack_rhe(neighbor.key),
+                distance=neighbor.distance,
+                count=0,
+                first_date=None,
+            )
+            for neighbor in unseen
+        ],
+    )
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        get_cache_validators((), nearest),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return nearest
@@ -0,0 +1,181 @@
+import datetime
+from collections.abc import Sequence
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRouter
+from pydantic import BaseModel
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx
+from app.common.models import orm as m
+from app.common.utils.rhe import unpack_rhe
+from app.web.http_cache import (
+    CACHE_CONTROL_FINAL,
+    CACHE_CONTROL_LIVE,
+    apply_cache_headers,
+    get_cache_validators,
+)
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+class SeasonStatsGetResponse(BaseModel):
+    season: int
+    game_count: int
+    scorhegami_count: int
+    most_common_rhe: list[int] | None
+    most_common_rhe_count: int | None
+    # Longest stretch between two consecutive ScoRHEgamis of the season.
+    longest_gap_days: int | None
+    longest_gap_start: datetime.date | None
+    longest_gap_end: datetime.date | None
+
+
+class TeamSeasonStatsGetResponse(SeasonStatsGetResponse):
+    team_id: int
+
+
+def _to_stats_dict(stats: m.SeasonStats | m.TeamSeasonStats) -> dict:
+    return {
+        "season": stats.season,
+        "game_count": stats.game_count,
+        "scorhegami_count": stats.scorhegami_count,
+        "most_common_rhe": (
+            unpack_rhe(stats.most_common_rhe_key)
+            if stats.most_common_rhe_key is not None
+            else None
+        ),
+        "most_common_rhe_count": stats.most_common_rhe_count,
+        "longest_gap_days": stats.longest_gap_days,
+        "longest_gap_start": stats.longest_gap_start,
+        "longest_gap_end": stats.longest_gap_end,
+    }
+
+
+def _get_stats_cache_control(seasons: Sequence[int]) -> str:
+    # Past seasons only change with backfills and fixes.
+    current_season = datetime.datetime.now(datetime.UTC).year
+    if not seasons or any(season >= current_season for season in seasons):
+        return CACHE_CONTROL_LIVE
+
+    return CACHE_CONTROL_FINAL
+
+
+@router.get("/season")
+async def _(request: Request, response: Response) -> list[SeasonStatsGetResponse]:
+    """Returns the stats of every season, oldest first."""
+
+    rows = (
+        (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(m.SeasonStats).order_by(m.SeasonStats.season.asc())
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_LIVE,
+        get_cache_validators((row.season, row.updated_at) for row in rows),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return [SeasonStatsGetResponse(**_to_stats_dict(row)) for row in rows]
+
+
+@router.get("/season/{season}")
+async def _(
+    request: Request, response: Response, season: int
+) -> SeasonStatsGetResponse:
+    stats = (
+        await AppCtx.current.db.session.execute(
+            sa_exp.select(m.SeasonStats).where(m.SeasonStats.season == season)
+        )
+    ).scalar_one_or_none()
+
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stats for season {season}",
+        )
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        _get_stats_cache_control([season]),
+        get_cache_validators([(stats.season, stats.updated_at)], single_resource=True),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return SeasonStatsGetResponse(**_to_stats_dict(stats))
+
+
+@router.get("/season/{season}/team")
+async def _(
+    request: Request, response: Response, season: int
+) -> list[TeamSeasonStatsGetResponse]:
+    """Returns the stats of every team that played in the season."""
+
+    rows = (
+        (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(m.TeamSeasonStats)
+                .where(m.TeamSeasonStats.season == season)
+                .order_by(m.TeamSeasonStats.team_id.asc())
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        _get_stats_cache_control([season]),
+        get_cache_validators((row.team_id, row.updated_at) for row in rows),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return [
+        TeamSeasonStatsGetResponse(team_id=row.team_id, **_to_stats_dict(row))
+        for row in rows
+    ]
+
+
+@router.get("/team/{team_id}")
+async def _(
+    request: Request, response: Response, team_id: int
+) -> list[TeamSeasonStatsGetResponse]:
+    """Returns the stats of every season the team played in, oldest first."""
+
+    rows = (
+        (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(m.TeamSeasonStats)
+                .where(m.TeamSeasonStats.team_id == team_id)
+                .order_by(m.TeamSeasonStats.season.asc())
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        _get_stats_cache_control([row.season for row in rows]),
+        get_cache_validators((row.season, row.updated_at) for row in rows),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    return [
+        TeamSeasonStatsGetResponse(team_id=row.team_id, **_to_stats_dict(row))
+        for row in rows
+    ]
@@ -1,10 +1,15 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.routing import APIRouter
 from pydantic import BaseModel, Field
 from sqlalchemy.sql import expression as sa_exp
 
 from app.common.ctx import AppCtx
 from app.common.models import orm as m
+from app.web.http_cache import (
+    CACHE_CONTROL_FINAL,
+    apply_cache_headers,
+    get_cache_validators,
+)
 
 router = APIRouter(prefix="/team", tags=["team"])
 
@@ -22,6 +27,8 @@ class TeamGetResponse(BaseModel):
 
 @router.get("")
 async def _(
+    request: Request,
+    response: Response,
     q: TeamGetRequest = Depends(),
 ) -> list[TeamGetResponse]:
     teams = (
@@ -37,6 +44,15 @@ async def _(
         .all()
     )
 
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_FINAL,
+        get_cache_validators((team.id, team.updated_at) for team in teams),
+    )
+    if not_modified is not None:
+        return not_modified
+
     return [
         TeamGetResponse(
             id=team.id,
@@ -48,7 +64,7 @@ async def _(
 
 
 @router.get("/{team_id}")
-async def _(team_id: int) -> TeamGetResponse:
+async def _(request: Request, response: Response, team_id: int) -> TeamGetResponse:
     team = (
         await AppCtx.current.db.session.execute(
             sa_exp.select(m.Team).where(m.Team.id == team_id)
@@ -61,6 +77,15 @@ async def _(team_id: int) -> TeamGetResponse:
             detail=f"Team with id {team_id} not found",
         )
 
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        CACHE_CONTROL_FINAL,
+        get_cache_validators([(team.id, team.updated_at)], single_resource=True),
+    )
+    if not_modified is not None:
+        return not_modified
+
     return TeamGetResponse(
         id=team.id,
         short_name=team.short_name,
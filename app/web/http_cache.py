@@ -0,0 +1,123 @@
+import dataclasses
+import datetime
+import email.utils
+import hashlib
+from collections.abc import Iterable
+
+from fastapi import Request, Response, status
+
+from app.common.models.app import GameStatusEnum
+
+# Classified finished games and other settled data. They still change now and then (ordinals
+# renumbered by a backfill, a recomputed classification, a renamed team), so caches revalidate
+# them through the ETag after a few minutes.
+CACHE_CONTROL_FINAL = "public, max-age=300, must-revalidate"
+# Results of queries that new or live games may still change.
+CACHE_CONTROL_LIVE = "public, max-age=30"
+
+_PENDING_STATUSES = {
+    GameStatusEnum.status_scheduled,
+    GameStatusEnum.status_in_progress,
+    GameStatusEnum.status_rain_delay,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheValidators:
+    etag: str
+    last_modified: datetime.datetime | None
+
+
+def get_cache_validators(
+    versions: Iterable[tuple[int, datetime.datetime]],
+    *extra: object,
+    single_resource: bool = False,
+) -> CacheValidators:
+    """
+    Derives a strong ETag from the (id, updated_at) pairs of the rows a response is built from.
+    `extra` is hashed along, for data that does not come from those rows.
+
+    Last-Modified is only set for a `single_resource`: a collection can gain or lose rows
+    without its newest updated_at moving, so it is revalidated through the ETag alone.
+    """
+
+    digest = hashlib.sha256()
+    last_modified: datetime.datetime | None = None
+
+    for row_id, updated_at in versions:
+        digest.update(f"{row_id}:{updated_at.isoformat()};".encode())
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+
+    for value in extra:
+        digest.update(f"{value!r};".encode())
+
+    return CacheValidators(
+        etag=f'"{digest.hexdigest()[:32]}"',
+        last_modified=last_modified if single_resource else None,
+    )
+
+
+def get_game_cache_control(games: Iterable[tuple[str | None, bool | None]]) -> str:
+    """
+    Takes the (status, is_scorhegami) pairs of the games in a response.
+    Finished games are live until they have been classified (is_scorhegami is not NULL).
+    """
+
+    for game_status, is_scorhegami in games:
+        if game_status in _PENDING_STATUSES:
+            return CACHE_CONTROL_LIVE
+        if game_status == GameStatusEnum.status_final and is_scorhegami is None:
+            return CACHE_CONTROL_LIVE
+
+    return CACHE_CONTROL_FINAL
+
+
+def apply_cache_headers(
+    request: Request,
+    response: Response,
+    cache_control: str,
+    validators: CacheValidators | None = None,
+) -> Response | None:
+    """
+    Sets the caching headers on `response`.
+    Returns a 304 response to send instead, if the client's copy is still up to date.
+    """
+
+    headers = {"Cache-Control": cache_control}
+
+    if validators is not None:
+        headers["ETag"] = validators.etag
+        if validators.last_modified is not None:
+            headers["Last-Modified"] = email.utils.format_datetime(
+                validators.last_modified.astimezone(datetime.UTC), usegmt=True
+            )
+
+    response.headers.update(headers)
+
+    if validators is not None and _is_not_modified(request, validators):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return None
+
+
+def _is_not_modified(request: Request, validators: CacheValidators) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses the weak comparison, so W/ prefixes added by proxies are ignored.
+        etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+        return "*" in etags or validators.etag in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and validators.last_modified is not None:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+        if since.tzinfo is None:
+            return False
+
+        return validators.last_modified.replace(microsecond=0) <= since
+
+    return False
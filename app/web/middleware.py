@@ -0,0 +1,21 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.common.ctx import bind_app_ctx
+
+
+class AppCtxMiddleware:
+    """
+    Binds the app context for the whole lifetime of each HTTP request, including streamed bodies.
+    Written as a plain ASGI middleware, as BaseHTTPMiddleware adds a task and a stream per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async with bind_app_ctx(scope["app"].extra["_app_ctx"]):
+            await self.app(scope, receive, send)
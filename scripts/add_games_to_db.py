@@ -7,6 +7,8 @@ from sqlalchemy.sql import expression as sa_exp
 import scripts.baseball_reference as bref
 from app.common.ctx import AppCtx
 from app.common.models import orm as m
+from app.common.utils.box_score import get_box_score_columns
+from app.common.utils.rhe import pack_rhe
 
 
 def get_team_id(name: str):
@@ -25,7 +27,7 @@ def get_team_id(name: str):
 def is_rhe_scorhegami(rhe: list[int]):
     rhe_exists = (
         AppCtx.current.db.session.scalar(
-            sa_exp.select(sa_exp.exists().where(m.Game.rhe == rhe))
+            sa_exp.select(sa_exp.exists().where(m.Game.rhe_key == pack_rhe(rhe)))
         )
         or False
     )
@@ -33,6 +35,24 @@ def is_rhe_scorhegami(rhe: list[int]):
     return not rhe_exists
 
 
+def is_box_score_unique(box_score: list[int], box_score_key: int):
+    # Keys can collide, so the box scores themselves are compared as well.
+    box_score_exists = (
+        AppCtx.current.db.session.scalar(
+            sa_exp.select(
+                sa_exp.exists().where(
+                    m.Game.box_score_key == box_score_key,
+                    m.Game.box_score == box_score,
+                    m.Game.is_unique_box_score.isnot(None),
+                )
+            )
+        )
+        or False
+    )
+
+    return not box_score_exists
+
+
 def main():
     for season in range(1901, 2025):
         results: list[str] = []
@@ -46,14 +66,19 @@ def main():
             home_team_id = get_team_id(game.home_team.name)
 
             is_scorhegami = is_rhe_scorhegami(game.rhe)
+            box_score_columns = get_box_score_columns(game.box_score)
             new_game = m.Game(
                 away_id=away_team_id,
                 home_id=home_team_id,
                 start_time=game.start_time,
                 end_time=None,
                 box_score=game.box_score,
+                **box_score_columns,
                 rhe=game.rhe,
                 is_scorhegami=is_scorhegami,
+                is_unique_box_score=is_box_score_unique(
+                    game.box_score, box_score_columns["box_score_key"]
+                ),
             )
 
             while True:
@@ -0,0 +1,111 @@
+"""
+Measures the per-request overhead of binding the app context, by calling a trivial
+endpoint that does not use the database directly through ASGI with
+- no middleware at all (baseline)
+- the previous BaseHTTPMiddleware, which always cleared the scoped session
+- the current AppCtxMiddleware
+
+No database connection is made. Run with `python -m scripts.bench_app_ctx_middleware`.
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.common.ctx import _current_app_ctx_var, create_app_ctx
+from app.common.settings import AppSettings
+from app.web.middleware import AppCtxMiddleware
+
+NUMBER = 5000
+
+
+@contextlib.asynccontextmanager
+async def legacy_bind_app_ctx(app_ctx):
+    ctx = dataclasses.replace(app_ctx, ctx_id=str(uuid.uuid4()))
+    token = _current_app_ctx_var.set(ctx)
+    try:
+        yield
+    finally:
+        await app_ctx.db.clear_scoped_session()
+        _current_app_ctx_var.reset(token)
+
+
+def make_app(app_ctx, middleware: str) -> FastAPI:
+    app = FastAPI()
+    app.extra["_app_ctx"] = app_ctx
+
+    @app.get("/ping")
+    async def _() -> int:
+        return 1
+
+    if middleware == "legacy":
+
+        async def app_ctx_middleware(request: Request, call_next):
+            async with legacy_bind_app_ctx(request.app.extra["_app_ctx"]):
+                response = await call_next(request)
+            return response
+
+        app.add_middleware(BaseHTTPMiddleware, dispatch=app_ctx_middleware)
+
+    elif middleware == "asgi":
+        app.add_middleware(AppCtxMiddleware)
+
+    return app
+
+
+async def call(app: FastAPI) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("localhost", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def bench(app: FastAPI) -> float:
+    for _ in range(100):
+        await call(app)
+
+    started = time.perf_counter()
+    for _ in range(NUMBER):
+        await call(app)
+
+    return (time.perf_counter() - started) / NUMBER * 1e6
+
+
+async def main():
+    app_ctx = await create_app_ctx(AppSettings(BALLDONTLIE_API_KEY=uuid.uuid4()))
+
+    baseline = await bench(make_app(app_ctx, "none"))
+    legacy = await bench(make_app(app_ctx, "legacy"))
+    asgi = await bench(make_app(app_ctx, "asgi"))
+
+    print(f"{NUMBER} requests")
+    print(f"no middleware:      {baseline:7.1f} us/request")
+    print(f"BaseHTTPMiddleware: {legacy:7.1f} us/request (+{legacy - baseline:.1f})")
+    print(f"AppCtxMiddleware:   {asgi:7.1f} us/request (+{asgi - baseline:.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Measures GET /game/box_score/search against the database of the settings (DB_URI), for broad
+and narrow constraints, following the cursor DEPTH pages deep. Every page should take about as
+long as the first one. Compare runs with and without ix_game_classified_chronological to see
+whether the planner walks it for the broad constraints.
+
+The requests go through ASGI, so no server needs to be running.
+Run with `python -m scripts.bench_box_score_search`.
+"""
+
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+from app.common.ctx import create_app_ctx
+from app.common.settings import AppSettings
+from app.web.apis.game import router as game_router
+from app.web.middleware import AppCtxMiddleware
+
+COUNT = 50
+DEPTH = 20
+REPEAT = 5
+
+CONSTRAINTS = {
+    # Most games match, so a sort of every match would be the slowest.
+    "broad (home:any:0)": ["home:any:0"],
+    "broad (either:1:0)": ["either:1:0"],
+    "medium (away:9:1)": ["away:9:1"],
+    "narrow (away:any:10)": ["away:any:10"],
+    "narrow (away:all:0, home:any:5)": ["away:all:0", "home:any:5"],
+}
+
+
+def make_app(app_ctx) -> FastAPI:
+    app = FastAPI()
+    app.extra["_app_ctx"] = app_ctx
+    app.include_router(game_router)
+    app.add_middleware(AppCtxMiddleware)
+    return app
+
+
+async def bench(client: httpx.AsyncClient, constraint: list[str]) -> list[float]:
+    """Returns the milliseconds each page took, first page first."""
+
+    timings: list[float] = []
+    cursor = None
+
+    for _ in range(DEPTH):
+        params: dict = {"count": COUNT, "constraint": constraint}
+        if cursor is not None:
+            params["cursor"] = cursor
+
+        started = time.perf_counter()
+        response = await client.get("/game/box_score/search", params=params)
+        timings.append((time.perf_counter() - started) * 1000)
+
+        response.raise_for_status()
+        cursor = response.json()["meta"]["next_cursor"]
+        if cursor is None:
+            break
+
+    return timings
+
+
+async def main():
+    app_ctx = await create_app_ctx(AppSettings(BALLDONTLIE_API_KEY=uuid.uuid4()))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=make_app(app_ctx)), base_url="http://bench"
+    ) as client:
+        print(f"{COUNT} games per page, up to {DEPTH} pages, best of {REPEAT}")
+
+        for name, constraint in CONSTRAINTS.items():
+            runs = [await bench(client, constraint) for _ in range(REPEAT)]
+            pages = [min(timings) for timings in zip(*runs)]
+
+            print(
+                f"{name:34} pages={len(pages):3} first={pages[0]:7.1f} ms "
+                f"median={statistics.median(pages):7.1f} ms last={pages[-1]:7.1f} ms"
+            )
+
+    await app_ctx.db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+"""
+Compares the serialization of a `GET /game?count=50` page through
+- the ORM path: `Game` objects -> `GameGetResponse` -> validated and dumped again by FastAPI
+- the fast path: column rows -> dicts -> a single `pydantic_core.to_json` call
+
+Only the CPU work after the query is measured. Run with `python -m scripts.bench_game_serialization`.
+"""
+
+import asyncio
+import collections
+import datetime
+import time
+import types
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.common.caches.rhe_index import RheIndex
+from app.common.caches.team_registry import TeamRegistry
+from app.common.ctx import _current_app_ctx_var
+from app.common.models import orm as m
+from app.common.models.app import TeamModel
+from app.web.apis.game import (
+    _GAME_COLUMNS,
+    GameGetResponse,
+    _json_response,
+    _to_game_dicts,
+)
+
+COUNT = 50
+NUMBER = 2000
+
+
+def make_games() -> list[m.Game]:
+    start_time = datetime.datetime(2024, 7, 4, 23, 5, tzinfo=datetime.UTC)
+    teams = [
+        m.Team(id=1, short_name="NYY", name="New York Yankees"),
+        m.Team(id=2, short_name="BOS", name="Boston Red Sox"),
+    ]
+
+    return [
+        m.Game(
+            id=i,
+            balldontlie_id=100000 + i,
+            away_id=1,
+            home_id=2,
+            away_team=teams[0],
+            home_team=teams[1],
+            start_time=start_time,
+            end_time=start_time + datetime.timedelta(hours=3),
+            status="STATUS_FINAL",
+            box_score=[
+                0,
+                1,
+                0,
+                0,
+                2,
+                0,
+                0,
+                0,
+                1,
+                4,
+                9,
+                1,
+                1,
+                0,
+                0,
+                0,
+                0,
+                3,
+                0,
+                0,
+                0,
+                4,
+                8,
+                0,
+            ],
+            rhe=[4, 9, 1, 4, 8, 0],
+            is_scorhegami=False,
+            scorhegami_ordinal=None,
+            is_unique_box_score=False,
+            bref_url=f"https://www.baseball-reference.com/boxes/BOS/BOS2024070{i}.shtml",
+            game_date=start_time.date(),
+            updated_at=start_time,
+        )
+        for i in range(COUNT)
+    ]
+
+
+def orm_path(games: list[m.Game], adapter: TypeAdapter) -> bytes:
+    responses = [
+        GameGetResponse(
+            id=game.id,
+            balldontlie_id=game.balldontlie_id,
+            away_team=TeamModel(
+                id=game.away_team.id,
+                short_name=game.away_team.short_name,
+                name=game.away_team.name,
+            ),
+            home_team=TeamModel(
+                id=game.home_team.id,
+                short_name=game.home_team.short_name,
+                name=game.home_team.name,
+            ),
+            start_time=game.start_time,
+            end_time=game.end_time,
+            status=game.status,
+            box_score=game.box_score,
+            rhe=game.rhe,
+            is_scorhegami=game.is_scorhegami,
+            scorhegami_ordinal=game.scorhegami_ordinal,
+            is_unique_box_score=game.is_unique_box_score,
+            bref_url=game.bref_url,
+            date=game.game_date,
+        )
+        for game in games
+    ]
+
+    # What FastAPI does with the returned value when the endpoint has a response model.
+    return adapter.dump_json(adapter.validate_python(responses))
+
+
+async def fast_path(rows: list[tuple]) -> bytes:
+    return _json_response(await _to_game_dicts(rows), Response()).body
+
+
+async def main():
+    team_registry = TeamRegistry(reload_interval=float("inf"))
+    team_registry._teams = {
+        1: TeamModel(id=1, short_name="NYY", name="New York Yankees"),
+        2: TeamModel(id=2, short_name="BOS", name="Boston Red Sox"),
+    }
+    team_registry._is_loaded = True
+    _current_app_ctx_var.set(
+        types.SimpleNamespace(team_registry=team_registry, rhe_index=RheIndex())
+    )
+
+    games = make_games()
+    # Stands in for sqlalchemy's Row, which supports both unpacking and attribute access.
+    GameRow = collections.namedtuple(
+        "GameRow", [column.key for column in _GAME_COLUMNS]
+    )
+    rows = [GameRow(*(getattr(game, key) for key in GameRow._fields)) for game in games]
+    adapter = TypeAdapter(list[GameGetResponse])
+
+    assert orm_path(games, adapter) == await fast_path(rows)
+
+    started = time.perf_counter()
+    for _ in range(NUMBER):
+        orm_path(games, adapter)
+    orm_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(NUMBER):
+        await fast_path(rows)
+    fast_time = time.perf_counter() - started
+
+    print(f"count={COUNT}, {NUMBER} iterations")
+    print(f"ORM path:  {orm_time / NUMBER * 1e6:8.1f} us/request")
+    print(f"fast path: {fast_time / NUMBER * 1e6:8.1f} us/request")
+    print(f"speedup:   {orm_time / fast_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
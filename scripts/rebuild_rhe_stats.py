@@ -0,0 +1,28 @@
+import asyncio
+
+from sqlalchemy import func as sa_func
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx, bind_app_ctx, create_app_ctx
+from app.common.models import orm as m
+from app.common.settings import AppSettings
+from app.common.utils.rhe_stats import rebuild_rhe_stats
+
+
+async def main():
+    app_ctx = await create_app_ctx(AppSettings())
+    async with bind_app_ctx(app_ctx):
+        written_cnt = await rebuild_rhe_stats()
+        await AppCtx.current.db.session.commit()
+
+        rhe_cnt = (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(sa_func.count()).select_from(m.RheStats)
+            )
+        ).scalar_one()
+
+        print(f"Rebuilt rhe_stats: {rhe_cnt} distinct RHEs, {written_cnt} rows written")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+import asyncio
+
+from sqlalchemy import func as sa_func
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx, bind_app_ctx, create_app_ctx
+from app.common.models import orm as m
+from app.common.settings import AppSettings
+from app.common.utils.season_stats import refresh_season_stats
+from app.common.utils.sqla import (
+    AdvisoryLockScorhegamiUpdaterTask,
+    obtain_advisory_lock,
+)
+
+
+async def main():
+    app_ctx = await create_app_ctx(AppSettings())
+    async with bind_app_ctx(app_ctx):
+        await obtain_advisory_lock(AdvisoryLockScorhegamiUpdaterTask(), timeout=60)
+
+        written_cnt = await refresh_season_stats(None)
+        await AppCtx.current.db.session.commit()
+
+        season_cnt = (
+            await AppCtx.current.db.session.execute(
+                sa_exp.select(sa_func.count()).select_from(m.SeasonStats)
+            )
+        ).scalar_one()
+
+        print(f"Rebuilt season_stats: {season_cnt} seasons, {written_cnt} rows written")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
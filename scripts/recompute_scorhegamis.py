@@ -0,0 +1,123 @@
+"""
+Recomputes `is_scorhegami` of every classified game from the chronological first game of each RHE,
+and writes back the games that were wrong. Run after backfilling or fixing the dates of games.
+It then renumbers the ScoRHEgami ordinals and rebuilds `rhe_stats` and the season stats, which
+scripts/add_games_to_db.py does not maintain, so this also runs when no game was misclassified.
+It also fills the box score key and tokens of games that lack them, and recomputes `is_unique_box_score`.
+Only the rows whose values change are written.
+
+    python -m scripts.recompute_scorhegamis [--dry-run] [--since 2025-04-01]
+
+`--since` only re-evaluates the RHEs of games updated since the given date (or datetime, in UTC);
+the ordinals and the stats are always checked in full.
+`--dry-run` prints the mismatches and how many rows would be written, then rolls everything back.
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+
+from sqlalchemy.sql import expression as sa_exp
+
+from app.common.ctx import AppCtx, bind_app_ctx, create_app_ctx
+from app.common.models import orm as m
+from app.common.models.app import NotifyChannelEnum
+from app.common.settings import AppSettings
+from app.common.utils.box_score import (
+    backfill_box_score_columns,
+    recompute_unique_box_scores,
+)
+from app.common.utils.pg_notify import notify
+from app.common.utils.rhe_stats import rebuild_rhe_stats
+from app.common.utils.scorhegami import (
+    find_scorhegami_mismatches,
+    renumber_scorhegami_ordinals,
+)
+from app.common.utils.season_stats import refresh_season_stats
+from app.common.utils.sqla import (
+    AdvisoryLockScorhegamiUpdaterTask,
+    obtain_advisory_lock,
+)
+
+
+def parse_since(value: str) -> datetime.datetime:
+    since = datetime.datetime.fromisoformat(value)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.UTC)
+    return since
+
+
+async def recompute(*, dry_run: bool, since: datetime.datetime | None) -> None:
+    started = time.perf_counter()
+
+    # Keeps ScorhegamiUpdaterTask from classifying games until this transaction ends.
+    await obtain_advisory_lock(AdvisoryLockScorhegamiUpdaterTask(), timeout=60)
+
+    mismatches = await find_scorhegami_mismatches(since=since)
+
+    for mismatch in mismatches:
+        print(
+            f"game {mismatch.game_id} ({mismatch.game_date}, rhe={mismatch.rhe}): "
+            f"is_scorhegami {mismatch.is_scorhegami} -> {mismatch.expected}"
+        )
+
+    print(f"{len(mismatches)} mismatches found in {time.perf_counter() - started:.2f}s")
+
+    # Games inserted without the box score columns (e.g. by an older backfill) get them first,
+    # since is_unique_box_score is computed from the key.
+    box_score_cnt = await backfill_box_score_columns()
+
+    if mismatches:
+        # Bulk UPDATE by primary key, sent as a single executemany.
+        await AppCtx.current.db.session.execute(
+            sa_exp.update(m.Game),
+            [
+                {"id": mismatch.game_id, "is_scorhegami": mismatch.expected}
+                for mismatch in mismatches
+            ],
+        )
+
+    renumbered_cnt = await renumber_scorhegami_ordinals()
+    rhe_stats_cnt = await rebuild_rhe_stats()
+    season_stats_cnt = await refresh_season_stats(None)
+    unique_box_score_cnt = await recompute_unique_box_scores()
+
+    summary = (
+        f"{len(mismatches)} games, {renumbered_cnt} ScoRHEgami ordinals, "
+        f"{rhe_stats_cnt} rhe_stats rows, {season_stats_cnt} season stats rows, "
+        f"{box_score_cnt} box score keys and {unique_box_score_cnt} unique box score flags"
+    )
+
+    if dry_run:
+        await AppCtx.current.db.session.rollback()
+        print(f"Would update {summary} ({time.perf_counter() - started:.2f}s)")
+        return
+
+    if (
+        mismatches
+        or renumbered_cnt
+        or rhe_stats_cnt
+        or season_stats_cnt
+        or box_score_cnt
+        or unique_box_score_cnt
+    ):
+        await notify(NotifyChannelEnum.game_classified)
+    await AppCtx.current.db.session.commit()
+
+    print(f"Updated {summary} in {time.perf_counter() - started:.2f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--since", type=parse_since, default=None)
+    args = parser.parse_args()
+
+    app_ctx = await create_app_ctx(AppSettings())
+    async with bind_app_ctx(app_ctx):
+        await recompute(dry_run=args.dry_run, since=args.since)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
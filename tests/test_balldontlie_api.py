@@ -0,0 +1,327 @@
+import asyncio
+import dataclasses
+import datetime
+import email.utils
+import json
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.common.api_clients.balldontlie import BalldontlieAPI
+from app.common.api_clients.rate_limiter import AsyncTokenBucket
+
+
+def _team_json(team_id: int) -> dict:
+    return {
+        "id": team_id,
+        "slug": f"team-{team_id}",
+        "abbreviation": f"T{team_id}",
+        "display_name": f"Team {team_id}",
+        "short_display_name": f"Team {team_id}",
+        "name": f"Team {team_id}",
+        "location": "Somewhere",
+        "league": "American",
+        "division": "East",
+    }
+
+
+def _game_json(game_id: int) -> dict:
+    team_data = {"hits": 0, "runs": 0, "errors": 0, "inning_scores": []}
+    return {
+        "id": game_id,
+        "home_team_name": "Team 1",
+        "away_team_name": "Team 2",
+        "home_team": _team_json(1),
+        "away_team": _team_json(2),
+        "season": 2025,
+        "postseason": False,
+        "date": "2025-04-01T17:05:00.000Z",
+        "home_team_data": team_data,
+        "away_team_data": team_data,
+    }
+
+
+@dataclasses.dataclass
+class _Response:
+    status_code: int
+    body: dict | None = None
+    headers: dict[str, str] = dataclasses.field(default_factory=dict)
+    # Seconds to wait before answering, e.g. to run into the client's timeout.
+    delay: float = 0.0
+    # Closes the connection without answering.
+    drop: bool = False
+
+
+def _ok(game_id: int = 1) -> _Response:
+    return _Response(200, {"data": _game_json(game_id)})
+
+
+class _Server(ThreadingHTTPServer):
+    """
+    HTTP/1.1 server on 127.0.0.1 that answers with the given responses in order,
+    and records when each request came in and from which client port.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.responses: list[_Response] = []
+        self.requested_at: list[float] = []
+        self.client_ports: list[int] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, *responses: _Response) -> None:
+        self.responses.extend(responses)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def do_GET(self) -> None:
+        self.server.requested_at.append(time.monotonic())
+        self.server.client_ports.append(self.client_address[1])
+        response = self.server.responses.pop(0)
+
+        if response.drop:
+            self.close_connection = True
+            return
+
+        time.sleep(response.delay)
+
+        body = json.dumps(response.body).encode() if response.body is not None else b""
+        try:
+            self.send_response(response.status_code)
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            # The client has given up on a delayed response.
+            self.close_connection = True
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[_Server]:
+    server = _Server()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _create_api(url: str, **kwargs) -> BalldontlieAPI:
+    kwargs = {
+        "requests_per_minute": 6000,
+        "burst": 10,
+        "backoff_base": 0.01,
+        **kwargs,
+    }
+    return BalldontlieAPI(url, "key", **kwargs)
+
+
+def _get_closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_retries_503(server):
+    server.respond(_Response(503), _Response(503), _ok())
+    api = _create_api(server.url)
+
+    game = asyncio.run(api.get_mlb_game(1))
+
+    assert game.data.id == 1
+    assert len(server.requested_at) == 3
+    assert api.stats.request_cnt == 3
+    assert api.stats.retry_cnt == 2
+
+
+def test_gives_up_after_max_retries(server):
+    server.respond(*(_Response(503) for _ in range(3)))
+    api = _create_api(server.url, max_retries=2)
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        asyncio.run(api.get_mlb_game(1))
+
+    assert exc_info.value.response.status_code == 503
+    assert len(server.requested_at) == 3
+    assert api.stats.retry_cnt == 2
+
+
+def test_does_not_retry_404(server):
+    server.respond(_Response(404), _ok())
+    api = _create_api(server.url)
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        asyncio.run(api.get_mlb_game(1))
+
+    assert exc_info.value.response.status_code == 404
+    assert len(server.requested_at) == 1
+    assert api.stats.retry_cnt == 0
+
+
+def test_retries_read_timeout(server):
+    server.respond(_Response(200, delay=1.0), _ok())
+    api = _create_api(server.url, timeout=0.2)
+
+    game = asyncio.run(api.get_mlb_game(1))
+
+    assert game.data.id == 1
+    assert len(server.requested_at) == 2
+    assert api.stats.retry_cnt == 1
+
+
+def test_gives_up_after_read_timeouts(server):
+    server.respond(*(_Response(200, delay=1.0) for _ in range(2)))
+    api = _create_api(server.url, timeout=0.2, max_retries=1)
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(api.get_mlb_game(1))
+
+    assert len(server.requested_at) == 2
+    assert api.stats.retry_cnt == 1
+
+
+def test_retries_dropped_connection(server):
+    server.respond(_Response(200, drop=True), _ok())
+    api = _create_api(server.url)
+
+    game = asyncio.run(api.get_mlb_game(1))
+
+    assert game.data.id == 1
+    assert len(server.requested_at) == 2
+    assert api.stats.retry_cnt == 1
+
+
+def test_retries_connect_error():
+    api = _create_api(f"http://127.0.0.1:{_get_closed_port()}", max_retries=2)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(api.get_mlb_game(1))
+
+    assert api.stats.request_cnt == 3
+    assert api.stats.retry_cnt == 2
+
+
+def test_reuses_connection(server):
+    server.respond(_ok(1), _ok(2), _ok(3))
+    api = _create_api(server.url)
+
+    async def run() -> None:
+        for game_id in (1, 2, 3):
+            await api.get_mlb_game(game_id)
+
+    asyncio.run(run())
+
+    assert len(set(server.client_ports)) == 1
+
+
+def test_waits_for_retry_after(server):
+    server.respond(_Response(429, headers={"Retry-After": "1"}), _ok())
+    api = _create_api(server.url)
+
+    game = asyncio.run(api.get_mlb_game(1))
+
+    assert game.data.id == 1
+    assert server.requested_at[1] - server.requested_at[0] >= 0.9
+    assert api.stats.retry_cnt == 1
+
+
+def test_does_not_wait_for_long_retry_after(server):
+    server.respond(_Response(429, headers={"Retry-After": "120"}), _ok())
+    api = _create_api(server.url, backoff_max=30.0)
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        asyncio.run(api.get_mlb_game(1))
+
+    assert exc_info.value.response.status_code == 429
+    assert len(server.requested_at) == 1
+
+
+def test_parses_retry_after_date():
+    api = _create_api(f"http://127.0.0.1:{_get_closed_port()}")
+    retry_at = datetime.datetime.now(tz=datetime.UTC) + datetime.timedelta(seconds=20)
+
+    delay = api._get_retry_after(
+        httpx.Response(
+            429,
+            headers={"Retry-After": email.utils.format_datetime(retry_at, usegmt=True)},
+        )
+    )
+
+    assert delay is not None
+    assert 18 <= delay <= 20
+    assert api._get_retry_after(httpx.Response(429)) is None
+    assert (
+        api._get_retry_after(httpx.Response(429, headers={"Retry-After": "x"})) is None
+    )
+
+
+def test_retry_after_holds_back_other_requests(server):
+    server.respond(_Response(429, headers={"Retry-After": "1"}), _ok(1), _ok(2))
+    api = _create_api(server.url)
+
+    async def run() -> None:
+        await api.get_mlb_game(1)
+        await api.get_mlb_game(2)
+
+    asyncio.run(run())
+
+    # The limiter is paused along with the retried request, so the next one is not sent early.
+    assert server.requested_at[2] - server.requested_at[0] >= 0.9
+
+
+def test_paces_requests_with_token_bucket(server):
+    server.respond(*(_ok(game_id) for game_id in range(6)))
+    api = _create_api(server.url, requests_per_minute=20 * 60, burst=2)
+
+    async def run() -> None:
+        await asyncio.gather(*(api.get_mlb_game(game_id) for game_id in range(6)))
+
+    started_at = time.monotonic()
+    asyncio.run(run())
+    elapsed = time.monotonic() - started_at
+
+    # 2 requests from the burst, then 4 more at 20 per second.
+    assert 0.18 <= elapsed < 1.0
+    assert api.stats.request_cnt == 6
+    assert api.stats.throttled_cnt == 4
+    assert api.stats.throttled_seconds > 0
+
+
+def test_token_bucket_serves_burst_right_away():
+    async def run() -> list[float]:
+        bucket = AsyncTokenBucket(rate=1, capacity=3)
+        return [await bucket.acquire() for _ in range(3)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.0]
+
+
+def test_token_bucket_pause():
+    async def run() -> float:
+        bucket = AsyncTokenBucket(rate=100, capacity=10)
+        bucket.pause(0.3)
+        return await bucket.acquire()
+
+    assert asyncio.run(run()) >= 0.25
@@ -0,0 +1,133 @@
+import datetime
+
+import pytest
+
+from app.common.caches import seen_rhe_set
+from app.common.caches.rhe_index import RheIndexEntry
+from app.common.caches.seen_rhe_set import SeenRheSet
+
+
+def _entry(final_count: int) -> RheIndexEntry:
+    return RheIndexEntry(
+        count=final_count + 1,
+        final_count=final_count,
+        first_date=datetime.date(2025, 4, 1) if final_count else None,
+        last_date=datetime.date(2025, 4, 1) if final_count else None,
+        scorhegami_game_id=1 if final_count else None,
+    )
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch) -> str:
+    monkeypatch.setattr(seen_rhe_set, "_REOPEN_INTERVAL", 0.0)
+    return str(tmp_path / "seen-rhes")
+
+
+def test_readers_see_what_the_writer_publishes(path):
+    writer = SeenRheSet(path, 16)
+    reader = SeenRheSet(path, 16)
+
+    assert reader.contains(0) is None
+
+    writer.rebuild({0: _entry(1), 7: _entry(2), 9: _entry(0)})
+
+    assert writer.is_writer
+    assert reader.contains(0) is True
+    assert reader.contains(7) is True
+    assert reader.contains(9) is False
+    assert reader.contains(8) is False
+
+
+def test_only_one_writer(path):
+    writer = SeenRheSet(path, 16)
+    other = SeenRheSet(path, 16)
+
+    writer.rebuild({1: _entry(1)})
+    other.rebuild({2: _entry(1)})
+
+    assert not other.is_writer
+    assert other.contains(1) is True
+    assert other.contains(2) is False
+    # Updates of a worker that does not write the set are ignored.
+    other.apply(2, _entry(1))
+    assert other.contains(2) is False
+
+
+def test_apply_adds_and_removes_keys(path):
+    writer = SeenRheSet(path, 16)
+    reader = SeenRheSet(path, 16)
+
+    writer.rebuild({1: _entry(1), 2: _entry(1)})
+    writer.apply(3, _entry(1))
+    writer.apply(1, None)
+    writer.apply(2, _entry(0))
+
+    assert [reader.contains(key) for key in (1, 2, 3)] == [False, False, True]
+
+
+def test_colliding_keys(path):
+    writer = SeenRheSet(path, 16)
+    reader = SeenRheSet(path, 16)
+
+    # Keys whose hash lands on the same slot of a 16-slot table.
+    keys = [
+        key
+        for key in range(1000)
+        if ((key * seen_rhe_set._HASH_MULTIPLIER) & seen_rhe_set._HASH_MASK) >> 60 == 0
+    ][:8]
+    writer.rebuild({key: _entry(1) for key in keys})
+    writer.apply(keys[0], None)
+
+    assert [reader.contains(key) for key in keys] == [False] + [True] * 7
+
+
+def test_falls_back_when_full(path):
+    writer = SeenRheSet(path, 4)
+    reader = SeenRheSet(path, 4)
+
+    writer.rebuild({1: _entry(1), 2: _entry(1)})
+    assert reader.contains(1) is True
+
+    writer.apply(3, _entry(1))
+    assert reader.contains(1) is None
+
+    writer.apply(3, None)
+    assert reader.contains(1) is True
+
+
+def test_another_worker_takes_over(path):
+    writer = SeenRheSet(path, 16)
+    other = SeenRheSet(path, 16)
+    reader = SeenRheSet(path, 16)
+
+    writer.rebuild({1: _entry(1)})
+    assert reader.contains(1) is True
+
+    writer.close()
+    # The data of the previous writer stays readable until the next one has written it.
+    assert reader.contains(1) is True
+
+    other.rebuild({2: _entry(1)})
+
+    assert other.is_writer
+    assert reader.contains(1) is False
+    assert reader.contains(2) is True
+
+
+def test_readers_follow_a_capacity_change(path):
+    writer = SeenRheSet(path, 16)
+    reader = SeenRheSet(path, 16)
+
+    writer.rebuild({1: _entry(1)})
+    assert reader.contains(1) is True
+    writer.close()
+
+    bigger_writer = SeenRheSet(path, 64)
+    bigger_writer.rebuild({key: _entry(1) for key in range(20)})
+
+    assert all(reader.contains(key) for key in range(20))
+
+
+def test_rejects_capacity_that_is_not_a_power_of_two(path):
+    with pytest.raises(ValueError):
+        SeenRheSet(path, 12)